@@ -1,8 +1,10 @@
 import streamlit as st
-import random
+import os
 import json
-from suguru_generator import generate_puzzle
-from suguru_solver import solve_puzzle
+from suguru_cache import SolutionCache
+from suguru_format import to_string, from_string
+from suguru_pool import PuzzlePool
+from suguru_grid import GridState
 import streamlit.components.v1 as components
 
 st.set_page_config(page_title="Suguru Interactif", page_icon="🧩", layout="centered")
@@ -10,91 +12,69 @@ st.set_page_config(page_title="Suguru Interactif", page_icon="🧩", layout="cen
 # ==============================
 # INIT SESSION
 # ==============================
-for key in ["user", "solution", "regions", "givens", "rows", "cols"]:
+for key in ["user", "solution", "regions", "givens", "rows", "cols", "grid", "waiting"]:
     if key not in st.session_state:
         st.session_state[key] = None if key != "user" else {}
 
+def load_puzzle(regions, solution, givens, rows, cols):
+    st.session_state.rows = rows
+    st.session_state.cols = cols
+    st.session_state.regions = regions
+    st.session_state.solution = solution
+    st.session_state.givens = givens
+    # état incrémental (conflits, SVG) ; user partage ses valeurs
+    st.session_state.grid = GridState(rows, cols, regions, givens)
+    st.session_state.user = st.session_state.grid.values
+
+# Grille partagée : ?grille=<code> (voir suguru_format.to_string)
+shared = st.experimental_get_query_params().get("grille")
+if shared and st.session_state.regions is None:
+    try:
+        regions, givens, solution, rows, cols = from_string(shared[0])
+        load_puzzle(regions, solution, givens, rows, cols)
+    except ValueError:
+        st.error("❌ Code de grille invalide.")
+
+# Cache de solutions partagé entre sessions (SUGURU_CACHE_DIR : niveau disque)
+@st.cache_resource
+def get_solution_cache():
+    return SolutionCache(maxsize=256, directory=os.environ.get("SUGURU_CACHE_DIR"))
+
+# Réserve de grilles 5x5 → 12x12 remplie en arrière-plan, partagée entre sessions
+@st.cache_resource
+def get_puzzle_pool():
+    pool = PuzzlePool(sizes=range(5, 13), per_kind=3,
+                      path=os.environ.get("SUGURU_POOL_FILE", ".suguru_pool.json"))
+    pool.start()
+    return pool
+
+get_puzzle_pool()   # le remplissage démarre dès le premier affichage
+
 # ==============================
 # GÉNÉRATION AUTO (5x5 → 12x12)
 # ==============================
 st.title("🧩 Suguru Interactif")
 
 if st.button("🔁 Générer une grille aléatoire (5×5 → 12×12)"):
-    st.info("Génération en cours...")
-    found = False
-    for size in range(5, 13):
-        for _ in range(150):
-            result = generate_puzzle(size, size, max_region_size=8)
-            if result:
-                regions, solution, givens = result
-                if len(givens) > 0:
-                    st.session_state.rows = size
-                    st.session_state.cols = size
-                    st.session_state.regions = regions
-                    st.session_state.solution = solution
-                    st.session_state.givens = givens
-                    st.session_state.user = dict(givens)
-                    found = True
-                    break
-        if found:
-            break
-    if found:
+    st.session_state.waiting = True
+
+if st.session_state.waiting:
+    # jamais de génération ici : on attend brièvement la réserve (remplie
+    # dans un autre processus), puis on réaffiche jusqu'à ce qu'une grille arrive
+    result = get_puzzle_pool().get(timeout=1.0)
+    if result:
+        st.session_state.waiting = False
+        load_puzzle(*result)
         st.success(f"✅ Grille {st.session_state.rows}×{st.session_state.cols} générée avec succès !")
     else:
-        st.error("❌ Impossible de générer une grille valide.")
-
-# ==============================
-# VALIDATION
-# ==============================
-def validate_grid(user, regions):
-    errors = []
-
-    # Règle 1 : doublons dans régions
-    for rid, cells in regions.items():
-        vals = [user.get(c) for c in cells if user.get(c)]
-        if len(vals) != len(set(vals)):
-            errors.append(f"Doublon dans la région {rid}")
-
-    # Règle 2 : valeurs adjacentes identiques
-    for (r, c), v in user.items():
-        if not v:
-            continue
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == dc == 0:
-                    continue
-                n = (r + dr, c + dc)
-                if n in user and user[n] == v:
-                    errors.append(f"Conflit entre ({r+1},{c+1}) et ({n[0]+1},{n[1]+1})")
-
-    return errors
+        st.info("⏳ Préparation des premières grilles...")
+        st.rerun()
 
 # ==============================
 # SVG INTERACTIF + JS
 # ==============================
-def render_interactive_svg(rows, cols, regions, user_values, givens):
-    cell_size = 50
-    palette = ["#e6f7ff", "#fff5e6", "#e6ffe6", "#ffe6f2", "#f2e6ff", "#f0fff0", "#fff0f5"]
-    region_colors = {}
-    svg_parts = [f'<svg id="suguru" width="{cols*cell_size}" height="{rows*cell_size}" xmlns="http://www.w3.org/2000/svg">']
-
-    for r in range(rows):
-        for c in range(cols):
-            cell_id = (r, c)
-            rid = None
-            for rid_, cells in regions.items():
-                if cell_id in cells:
-                    rid = rid_
-                    break
-            color = region_colors.setdefault(rid, palette[len(region_colors) % len(palette)])
-            x, y = c * cell_size, r * cell_size
-            svg_parts.append(f'<rect x="{x}" y="{y}" width="{cell_size}" height="{cell_size}" fill="{color}" stroke="black" stroke-width="1" data-row="{r}" data-col="{c}" class="cell"/>')
-            val = user_values.get(cell_id, "")
-            color_text = "black" if cell_id not in givens else "darkblue"
-            svg_parts.append(f'<text x="{x + cell_size/2}" y="{y + cell_size/2 + 6}" text-anchor="middle" font-size="20" fill="{color_text}">{val}</text>')
-
-    svg_parts.append("</svg>")
-    svg_code = "".join(svg_parts)
+def render_interactive_svg(grid):
+    svg_code = grid.svg()
 
     html_code = f"""
     <html>
@@ -126,8 +106,11 @@ msg = st.experimental_get_query_params().get("msg")
 if st.session_state.regions:
     rows, cols = st.session_state.rows, st.session_state.cols
     st.subheader(f"🎯 Grille {rows}×{cols}")
+    code = to_string(st.session_state.regions, st.session_state.givens, rows=rows, cols=cols)
+    st.text_input("🔗 Partager cette grille (ajouter ?grille=<code> à l'URL)", code)
 
-    html = render_interactive_svg(rows, cols, st.session_state.regions, st.session_state.user, st.session_state.givens)
+    grid = st.session_state.grid
+    html = render_interactive_svg(grid)
     components.html(html, height=rows * 55, scrolling=False)
 
     # Petit hack : écoute les messages du navigateur (Streamlit ne supporte pas les events JS nativement)
@@ -140,16 +123,13 @@ if st.session_state.regions:
             if cell in st.session_state.givens:
                 st.warning("⛔ Case initiale non modifiable.")
             else:
-                if v == 0:
-                    st.session_state.user.pop(cell, None)
-                else:
-                    st.session_state.user[cell] = v
+                grid.set(cell, v)
             st.experimental_set_query_params()  # efface le paramètre
             st.rerun()
         except Exception:
             pass
 
-    errors = validate_grid(st.session_state.user, st.session_state.regions)
+    errors = grid.errors()
     if errors:
         st.error("⚠️ " + "\n".join(errors))
     else:
@@ -157,14 +137,26 @@ if st.session_state.regions:
 
     if st.button("🧮 Générer la solution complète"):
         try:
-            sol = solve_puzzle(st.session_state.regions, st.session_state.givens)
-            if sol:
+            progress_text = st.empty()
+
+            def show_progress(nodes, depth, rate):
+                progress_text.text(f"Recherche : {nodes} noeuds, profondeur {depth}, {rate:.0f} noeuds/s")
+
+            res = get_solution_cache().solve_with_status(st.session_state.regions, st.session_state.givens,
+                                                         rows=st.session_state.rows, cols=st.session_state.cols,
+                                                         time_limit=10.0, progress=show_progress)
+            progress_text.empty()
+            if res.status == "solved":
+                sol = res.solution
                 st.session_state.solution = sol
-                st.session_state.user = dict(sol)
+                for cell, v in sol.items():
+                    grid.set(cell, v)
                 st.success("✅ Solution générée et affichée.")
                 st.rerun()
+            elif res.status == "timeout":
+                st.error("⏱️ Résolution interrompue : délai de 10 s dépassé.")
             else:
-                st.error("❌ Échec de la résolution automatique.")
+                st.error("❌ Cette grille n'a pas de solution.")
         except Exception as e:
             st.error(f"Erreur solveur : {e}")
 
@@ -0,0 +1,315 @@
+# suguru_bench.py
+"""
+Banc d'essai reproductible des moteurs et du générateur.
+
+Corpus fixe (graine) de grilles carrées de 5x5 à 30x30, quatre sortes :
+- "easy" / "hard" : generate_puzzle(difficulty=...)
+- "unsat" : grille "hard" dont un given est remplacé par une valeur qui ne
+  heurte aucun autre given mais rend la grille insoluble (prouvé par le
+  solveur, pas une contradiction directe)
+- "multi" : grille "hard" privée de givens jusqu'à avoir plusieurs solutions
+
+Mesures : temps de résolution (meilleur de `repeat`), noeuds, noeuds/s et
+pic mémoire (tracemalloc, exécution séparée) par couple (grille, moteur) ;
+débit du générateur (grilles/s) par taille. Résultats en JSON, comparables
+d'une exécution à l'autre avec un seuil de régression.
+
+    python -m suguru_bench run -o bench.json --corpus corpus.suglib
+    python -m suguru_bench compare base.json bench.json --threshold 0.10
+
+Le corpus est long à générer pour les grandes tailles (~20 s pour un 25x25) :
+avec --corpus, il est écrit une fois en bibliothèque (suguru_format) puis relu.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from suguru_format import PuzzleLibrary, write_library
+from suguru_generator import dig_puzzle, generate_puzzle
+from suguru_solver import Cell, compile_layout, count_solutions, solve_with_status
+
+KINDS = ("easy", "hard", "unsat", "multi")
+SIZES = (5, 8, 10, 12, 16, 20, 25, 30)
+
+# variantes mesurées : nom -> options de solve_with_status
+ENGINES: Dict[str, dict] = {
+    "bitset": {"engine": "bitset", "propagation": True},
+    "bitset-fc": {"engine": "bitset", "propagation": False},
+    "dlx": {"engine": "dlx"},
+    "backtrack": {"engine": "backtrack", "propagation": True},
+    "cbj": {"engine": "cbj", "propagation": True},
+}
+
+# statut attendu de la résolution, par sorte de grille
+EXPECTED = {"easy": "solved", "hard": "solved", "unsat": "unsat", "multi": "solved"}
+
+Entry = Tuple[str, str, Dict[int, List[Cell]], Dict[Cell,int], int, int]
+
+
+def _make_unsat(regions, solution, givens, rows, cols, rng, probe_nodes=20000,
+                tries=50) -> Optional[Dict[Cell,int]]:
+    # remplace un given par une autre valeur, sans conflit direct avec les
+    # autres givens, jusqu'à ce que le solveur prouve l'insolubilité
+    layout = compile_layout(regions, rows, cols)
+    cells = sorted(givens)
+    rng.shuffle(cells)
+    for cell in cells[:tries]:
+        i = cell[0] * cols + cell[1]
+        for v in range(1, layout.size[i] + 1):
+            if v == solution[cell]:
+                continue
+            if any(givens.get(divmod(p, cols)) == v for p in layout.peers[i]):
+                continue
+            candidate = dict(givens)
+            candidate[cell] = v
+            res = solve_with_status(layout, candidate, timeout_nodes=probe_nodes)
+            if res.status == "unsat":
+                return candidate
+    return None
+
+def _make_multi(regions, givens, rows, cols, rng, probe_nodes=20000) -> Optional[Dict[Cell,int]]:
+    # retire des givens jusqu'à ce qu'il existe au moins deux solutions
+    layout = compile_layout(regions, rows, cols)
+    candidate = dict(givens)
+    cells = sorted(givens)
+    rng.shuffle(cells)
+    for cell in cells:
+        del candidate[cell]
+        n = count_solutions(layout, candidate, limit=2, timeout_nodes=probe_nodes)
+        if n == 2:
+            return candidate
+    return None
+
+def build_corpus(sizes: Iterable[int]=SIZES, kinds: Iterable[str]=KINDS, per_size: int=1,
+                 seed: int=0, max_region_size: int=5) -> List[Entry]:
+    """
+    Corpus déterministe : pour chaque taille n et k < per_size, une grille
+    générée avec la graine (seed, n, k), déclinée dans les sortes demandées
+    (mêmes régions et solution, givens différents).
+    Retour: liste de (nom, sorte, regions, givens, rows, cols) ;
+    une sorte impossible à construire pour une grille est omise.
+    """
+    kinds = tuple(kinds)
+    for kind in kinds:
+        if kind not in KINDS:
+            raise ValueError(f"unknown kind {kind!r}, expected one of {KINDS}")
+    corpus: List[Entry] = []
+    for n in sizes:
+        for k in range(per_size):
+            base_seed = seed * 1000003 + n * 1009 + k
+            hard = generate_puzzle(n, n, max_region_size, seed=base_seed, difficulty="hard")
+            if hard is None:
+                continue
+            regions, solution, hard_givens = hard
+            for kind in kinds:
+                name = f"{n}x{n}-{kind}-{k}"
+                rng = random.Random(base_seed)
+                if kind == "easy":
+                    # même grille, givens retirés tant que la propagation suffit
+                    givens = dig_puzzle(regions, solution, n, n, difficulty="easy", seed=base_seed)
+                elif kind == "hard":
+                    givens = hard_givens
+                elif kind == "unsat":
+                    givens = _make_unsat(regions, solution, hard_givens, n, n, rng)
+                else:
+                    givens = _make_multi(regions, hard_givens, n, n, rng)
+                if givens is not None:
+                    corpus.append((name, kind, regions, givens, n, n))
+    return corpus
+
+def save_corpus(path: str, corpus: Sequence[Entry]) -> int:
+    """Écrit le corpus en bibliothèque (difficulté = rang de la sorte dans KINDS)."""
+    return write_library(path, ((regions, givens, None, KINDS.index(kind))
+                                for _, kind, regions, givens, _, _ in corpus))
+
+def load_corpus(path: str) -> List[Entry]:
+    """Relit un corpus écrit par save_corpus (noms reconstruits dans le même ordre)."""
+    corpus: List[Entry] = []
+    seen: Dict[Tuple[int, int, str], int] = {}
+    with PuzzleLibrary(path) as lib:
+        for pid in range(len(lib)):
+            regions, givens, _, rows, cols = lib[pid]
+            kind = KINDS[lib.entry(pid)[4]]
+            k = seen.get((rows, cols, kind), 0)
+            seen[(rows, cols, kind)] = k + 1
+            corpus.append((f"{rows}x{cols}-{kind}-{k}", kind, regions, givens, rows, cols))
+    return corpus
+
+
+def bench_solve(corpus: Sequence[Entry], engines: Iterable[str]=ENGINES, repeat: int=3,
+                time_limit: Optional[float]=10.0, memory: bool=True) -> List[dict]:
+    """
+    Mesure chaque moteur sur chaque grille : meilleur temps sur `repeat`
+    exécutions (une seule si la première épuise time_limit), noeuds, noeuds/s,
+    pic mémoire en Kio (exécution à part, tracemalloc ralentit la recherche).
+    """
+    results = []
+    for name, kind, regions, givens, rows, cols in corpus:
+        layout = compile_layout(regions, rows, cols)
+        for engine in engines:
+            options = ENGINES[engine]
+            best = None
+            for _ in range(max(repeat, 1)):
+                res = solve_with_status(layout, givens, time_limit=time_limit, **options)
+                if best is None or res.elapsed < best.elapsed:
+                    best = res
+                if res.status == "timeout":
+                    break
+            row = {"puzzle": name, "size": rows, "kind": kind, "engine": engine,
+                   "status": best.status, "ok": best.status == EXPECTED[kind],
+                   "time": round(best.elapsed, 6), "nodes": best.nodes,
+                   "nodes_per_s": round(best.nodes / best.elapsed) if best.elapsed else None}
+            if memory:
+                tracemalloc.start()
+                try:
+                    solve_with_status(layout, givens, time_limit=time_limit, **options)
+                    row["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+                finally:
+                    tracemalloc.stop()
+            results.append(row)
+    return results
+
+def bench_generator(sizes: Iterable[int]=(5, 8, 10, 12, 16), difficulty: str="hard", count: int=3,
+                    seed: int=0, max_region_size: int=5) -> List[dict]:
+    """Débit du générateur : `count` grilles par taille, graines seed, seed+1, ..."""
+    results = []
+    for n in sizes:
+        start = time.perf_counter()
+        made = 0
+        for k in range(count):
+            if generate_puzzle(n, n, max_region_size, seed=seed + k, difficulty=difficulty):
+                made += 1
+        elapsed = time.perf_counter() - start
+        results.append({"size": n, "difficulty": difficulty, "count": made, "time": round(elapsed, 6),
+                        "puzzles_per_s": round(made / elapsed, 4) if elapsed else None})
+    return results
+
+def run_benchmarks(sizes: Iterable[int]=SIZES, engines: Iterable[str]=ENGINES, kinds: Iterable[str]=KINDS,
+                   per_size: int=1, seed: int=0, repeat: int=3, time_limit: Optional[float]=10.0,
+                   memory: bool=True, gen_sizes: Iterable[int]=(5, 8, 10, 12, 16), gen_count: int=3,
+                   corpus_path: Optional[str]=None) -> dict:
+    """
+    Exécution complète : corpus (relu depuis corpus_path s'il existe, sinon
+    généré puis écrit), résolution, générateur. Retour: dict sérialisable en JSON.
+    """
+    sizes = list(sizes)
+    engines = list(engines)
+    for engine in engines:
+        if engine not in ENGINES:
+            raise ValueError(f"engine inconnu : {engine!r} (attendu : {', '.join(ENGINES)})")
+    if corpus_path and os.path.exists(corpus_path):
+        corpus = [e for e in load_corpus(corpus_path) if e[4] in sizes and e[1] in kinds]
+    else:
+        corpus = build_corpus(sizes, kinds, per_size=per_size, seed=seed)
+        if corpus_path:
+            save_corpus(corpus_path, corpus)
+    gen_sizes = list(gen_sizes)
+    return {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "platform": platform.platform(), "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "seed": seed, "sizes": sizes, "engines": engines, "repeat": repeat,
+                 "time_limit": time_limit},
+        "solve": bench_solve(corpus, engines, repeat=repeat, time_limit=time_limit, memory=memory),
+        "generate": bench_generator(gen_sizes, count=gen_count, seed=seed) if gen_sizes and gen_count else [],
+    }
+
+def compare(baseline: dict, current: dict, threshold: float=0.10, min_time: float=0.01) -> List[str]:
+    """
+    Régressions de current par rapport à baseline :
+    - statut différent pour un même couple (grille, moteur)
+    - temps de résolution plus de (1 + threshold) fois plus long (mesures
+      sous min_time secondes ignorées, trop bruitées)
+    - débit du générateur plus de (1 + threshold) fois plus faible
+    Retour: liste de messages (vide = pas de régression)
+    """
+    problems = []
+    base_solve = {(r["puzzle"], r["engine"]): r for r in baseline.get("solve", [])}
+    for r in current.get("solve", []):
+        b = base_solve.get((r["puzzle"], r["engine"]))
+        if b is None:
+            continue
+        key = f'{r["puzzle"]} [{r["engine"]}]'
+        if r["status"] != b["status"]:
+            problems.append(f'{key} : statut {b["status"]} -> {r["status"]}')
+        elif r["status"] != "timeout" and b["time"] >= min_time and r["time"] > b["time"] * (1 + threshold):
+            problems.append(f'{key} : {b["time"]:.4f}s -> {r["time"]:.4f}s (x{r["time"] / b["time"]:.2f})')
+    base_gen = {(g["size"], g["difficulty"]): g for g in baseline.get("generate", [])}
+    for g in current.get("generate", []):
+        b = base_gen.get((g["size"], g["difficulty"]))
+        if not b or not b["puzzles_per_s"] or g["puzzles_per_s"] is None:
+            continue
+        if g["puzzles_per_s"] * (1 + threshold) < b["puzzles_per_s"]:
+            problems.append(f'générateur {g["size"]}x{g["size"]} {g["difficulty"]} : '
+                            f'{b["puzzles_per_s"]:.3f} -> {g["puzzles_per_s"]:.3f} grilles/s')
+    return problems
+
+def _summary(results: dict, out):
+    for r in results["solve"]:
+        flag = "" if r["ok"] else "  (attendu : " + EXPECTED[r["kind"]] + ")"
+        print(f'{r["puzzle"]:<16} {r["engine"]:<10} {r["status"]:<8} {r["time"]:>10.4f}s '
+              f'{r["nodes"]:>9} noeuds{flag}', file=out)
+    for g in results["generate"]:
+        print(f'générateur {g["size"]}x{g["size"]} {g["difficulty"]} : {g["puzzles_per_s"]} grilles/s', file=out)
+
+def main(argv: Optional[List[str]]=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m suguru_bench", description="Banc d'essai Suguru")
+    sub = parser.add_subparsers(dest="command")
+    run = sub.add_parser("run", help="exécute le banc d'essai")
+    run.add_argument("-o", "--output", default="-", help="fichier JSON de résultats (défaut : stdout)")
+    run.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    run.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    run.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    run.add_argument("--per-size", type=int, default=1, help="grilles par taille et par sorte")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--time-limit", type=float, default=10.0, help="secondes par résolution")
+    run.add_argument("--no-memory", action="store_true", help="sans mesure du pic mémoire")
+    run.add_argument("--gen-sizes", type=int, nargs="*", default=[5, 8, 10, 12, 16])
+    run.add_argument("--gen-count", type=int, default=3, help="grilles générées par taille")
+    run.add_argument("--corpus", default=None, help="bibliothèque du corpus (relue si elle existe)")
+    run.add_argument("--baseline", default=None, help="résultats de référence à comparer")
+    run.add_argument("--threshold", type=float, default=0.10)
+    cmp_ = sub.add_parser("compare", help="compare deux fichiers de résultats")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(args.sizes, args.engines, args.kinds, per_size=args.per_size,
+                                 seed=args.seed, repeat=args.repeat, time_limit=args.time_limit,
+                                 memory=not args.no_memory, gen_sizes=args.gen_sizes,
+                                 gen_count=args.gen_count, corpus_path=args.corpus)
+        text = json.dumps(results, indent=2)
+        if args.output == "-":
+            print(text)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        _summary(results, sys.stderr)
+        if not args.baseline:
+            return 0
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    elif args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            results = json.load(f)
+    else:
+        parser.print_help()
+        return 2
+    problems = compare(baseline, results, threshold=args.threshold)
+    for p in problems:
+        print("régression : " + p, file=sys.stderr)
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
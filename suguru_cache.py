@@ -0,0 +1,205 @@
+# suguru_cache.py
+"""
+Cache de solutions Suguru, indépendant de l'orientation de la grille.
+
+La clé est la forme canonique de (regions, givens) :
+- les 8 symétries du carré (rotations / réflexions) sont essayées ;
+- dans chaque orientation, les régions sont renumérotées dans l'ordre de
+  lecture (les ids d'origine ne comptent pas) ;
+- la plus petite des 8 représentations (en octets) est retenue.
+
+Deux grilles identiques à une symétrie et à une renumérotation près
+partagent donc la même entrée ; la solution stockée (dans l'orientation
+canonique) est ramenée dans l'orientation de l'appelant. Une recherche en
+cache coûte O(taille de la grille).
+
+Deux niveaux : LRU en mémoire, et en option un répertoire sur disque
+(un petit fichier par grille, nommé par le sha256 de la clé).
+
+    cache = SolutionCache(maxsize=1024, directory="~/.cache/suguru")
+    sol = cache.solve(regions, givens)     # résout au premier appel seulement
+"""
+
+from typing import Dict, List, Optional, Tuple
+from array import array
+from collections import OrderedDict
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+from suguru_solver import Cell, SolveResult, grid_dims, solve_with_status
+
+# (r, c) d'origine de la case (r2, c2) d'une orientation de dimensions (R2, C2),
+# la grille d'origine ayant R lignes et C colonnes
+_TRANSFORMS = (
+    (False, lambda r2, c2, R, C: (r2, c2)),
+    (True,  lambda r2, c2, R, C: (R - 1 - c2, r2)),          # rotation 90°
+    (False, lambda r2, c2, R, C: (R - 1 - r2, C - 1 - c2)),  # rotation 180°
+    (True,  lambda r2, c2, R, C: (c2, C - 1 - r2)),          # rotation 270°
+    (False, lambda r2, c2, R, C: (r2, C - 1 - c2)),          # miroir vertical
+    (False, lambda r2, c2, R, C: (R - 1 - r2, c2)),          # miroir horizontal
+    (True,  lambda r2, c2, R, C: (c2, r2)),                  # transposition
+    (True,  lambda r2, c2, R, C: (R - 1 - c2, C - 1 - r2)),  # anti-transposition
+)
+
+
+def canonical_form(regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+                   rows: Optional[int]=None, cols: Optional[int]=None) -> Tuple[bytes, List[int]]:
+    """
+    Forme canonique de la grille.
+    Retour: (clé en octets, order) où order[k] est l'indice d'origine
+    (r*cols+c) de la k-ième case de l'orientation canonique, en ordre de lecture.
+    """
+    rows, cols = grid_dims(regions, rows, cols)
+    n = rows * cols
+    owner = [-1] * n
+    for k, cells in enumerate(regions.values()):
+        for (r,c) in cells:
+            owner[r*cols + c] = k
+    given = bytearray(n)
+    for (r,c), v in (givens or {}).items():
+        if 0 <= r < rows and 0 <= c < cols:
+            given[r*cols + c] = v
+
+    best_key = None
+    best_order: List[int] = []
+    for swap, origin in _TRANSFORMS:
+        R2, C2 = (cols, rows) if swap else (rows, cols)
+        order = []
+        for r2 in range(R2):
+            for c2 in range(C2):
+                r, c = origin(r2, c2, rows, cols)
+                order.append(r*cols + c)
+        # régions renumérotées par première apparition (0 = hors région)
+        relabel: Dict[int, int] = {}
+        labels = array("H", bytes(2 * n))
+        for k, i in enumerate(order):
+            o = owner[i]
+            if o >= 0:
+                labels[k] = relabel.setdefault(o, len(relabel) + 1)
+        key = (array("H", (R2, C2)).tobytes() + labels.tobytes()
+               + bytes(given[i] for i in order))
+        if best_key is None or key < best_key:
+            best_key = key
+            best_order = order
+    return best_key, best_order
+
+
+class SolutionCache:
+    """
+    Solutions indexées par forme canonique : LRU de maxsize entrées en
+    mémoire, plus un répertoire optionnel (directory) qui survit aux
+    redémarrages. Utilisable depuis plusieurs threads.
+    """
+
+    def __init__(self, maxsize: int=1024, directory: Optional[str]=None):
+        self.maxsize = maxsize
+        self.directory = os.path.expanduser(directory) if directory else None
+        self._memory: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+            rows: Optional[int]=None, cols: Optional[int]=None) -> Optional[Dict[Cell,int]]:
+        """Solution en cache, dans l'orientation de l'appelant, ou None."""
+        key, order = canonical_form(regions, givens, rows, cols)
+        values = self._lookup(key)
+        return None if values is None else self._unmap(values, order, regions, rows, cols)
+
+    def put(self, regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]],
+            solution: Dict[Cell,int], rows: Optional[int]=None, cols: Optional[int]=None):
+        """Enregistre la solution de (regions, givens)."""
+        key, order = canonical_form(regions, givens, rows, cols)
+        self._store(key, self._map(solution, order, regions, rows, cols))
+
+    def solve(self, regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+              rows: Optional[int]=None, cols: Optional[int]=None, **solve_kwargs) -> Optional[Dict[Cell,int]]:
+        """
+        Comme solve_puzzle (mêmes options, moteur bitset + propagation par
+        défaut), mais ne cherche qu'au premier appel pour une grille donnée.
+        Les échecs (insoluble / timeout / annulé) ne sont pas mis en cache.
+        """
+        return self.solve_with_status(regions, givens, rows, cols, **solve_kwargs).solution
+
+    def solve_with_status(self, regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+                          rows: Optional[int]=None, cols: Optional[int]=None, **solve_kwargs) -> SolveResult:
+        """Comme solve, avec le SolveResult de suguru_solver.solve_with_status (0 noeud si en cache)."""
+        start = time.perf_counter()
+        key, order = canonical_form(regions, givens, rows, cols)
+        values = self._lookup(key)
+        if values is not None:
+            return SolveResult("solved", self._unmap(values, order, regions, rows, cols), 0,
+                               time.perf_counter() - start)
+        result = solve_with_status(regions, givens, rows=rows, cols=cols, **solve_kwargs)
+        if result.solution is not None:
+            self._store(key, self._map(result.solution, order, regions, rows, cols))
+        return result
+
+    def clear(self):
+        """Vide le niveau mémoire (le répertoire n'est pas touché)."""
+        with self._lock:
+            self._memory.clear()
+
+    @staticmethod
+    def _cols(regions, cols):
+        return grid_dims(regions, 0, cols)[1]
+
+    def _map(self, solution, order, regions, rows, cols) -> bytes:
+        # valeurs de la solution dans l'ordre de lecture canonique (0 = hors région)
+        cols = self._cols(regions, cols)
+        return bytes(solution.get(divmod(i, cols), 0) for i in order)
+
+    def _unmap(self, values, order, regions, rows, cols) -> Dict[Cell,int]:
+        cols = self._cols(regions, cols)
+        return {divmod(i, cols): v for i, v in zip(order, values) if v}
+
+    def _path(self, key: bytes) -> str:
+        digest = hashlib.sha256(key).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _lookup(self, key: bytes) -> Optional[bytes]:
+        with self._lock:
+            values = self._memory.get(key)
+            if values is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return values
+        if self.directory:
+            try:
+                with open(self._path(key), "rb") as f:
+                    values = f.read()
+            except OSError:
+                values = None
+            if values is not None:
+                self._remember(key, values)
+                with self._lock:
+                    self.hits += 1
+                return values
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key: bytes, values: bytes):
+        with self._lock:
+            self._memory[key] = values
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def _store(self, key: bytes, values: bytes):
+        self._remember(key, values)
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # écriture atomique : fichier temporaire puis renommage
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(values)
+                os.replace(tmp, path)
+            except OSError:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
@@ -0,0 +1,380 @@
+# suguru_cbj.py
+"""
+Moteur à retour arrière non chronologique (engine="cbj"), pour les grandes
+grilles peu contraintes où le retour arrière chronologique s'enlise.
+
+- racine : givens propagés jusqu'au point fixe (BitsetSolver), puis
+  forward checking sur domaines bitmask
+- raisons : past_fc[i] = niveaux (masque de bits) des assignations qui ont
+  retiré une valeur du domaine de i ; quand un domaine se vide, ces
+  niveaux rejoignent l'ensemble de conflit du niveau courant
+- backjumping (FC-CBJ) : un choix épuisé saute directement au niveau le
+  plus profond de son ensemble de conflit, qui hérite du reste de l'ensemble
+- nogoods : chaque saut apprend les assignations en cause (au plus
+  max_nogood_size), gardées dans un magasin borné (max_nogoods, les moins
+  récemment utiles sont évincés) ; quand tous les littéraux d'un nogood
+  sauf un sont vrais, la dernière valeur est retirée
+- redémarrages : suite de Luby × restart_nodes noeuds, ordre des valeurs
+  aléatoire après le premier ; choix MRV départagé par les poids de
+  conflit des cellules ; nogoods et poids survivent aux redémarrages
+
+Utilisé par suguru_solver.solve_puzzle(..., engine="cbj").
+"""
+
+from typing import Dict, List, Optional, Set, Tuple, Union
+from collections import OrderedDict
+import random
+import time
+
+from suguru_solver import BitsetSolver, Cell, CompiledLayout, _popcount, compile_layout
+from suguru_stats import Budget, SolveStats
+
+
+def luby(k: int) -> int:
+    """k-ième terme (k >= 1) de la suite de Luby : 1 1 2 1 1 2 4 1 1 2 ..."""
+    while True:
+        p = 1
+        while (1 << p) - 1 < k:
+            p += 1
+        if k == (1 << p) - 1:
+            return 1 << (p - 1)
+        k -= (1 << (p - 1)) - 1
+
+
+class CBJSolver:
+    """Même interface que BitsetSolver : solve(), count(), nodes, timed_out, cancelled, stats."""
+
+    def __init__(self, regions: Union[Dict[int, List[Cell]], CompiledLayout],
+                 givens: Optional[Dict[Cell,int]] = None,
+                 rows: Optional[int]=None, cols: Optional[int]=None,
+                 max_nogoods: int=2000, max_nogood_size: int=12, restart_nodes: int=100):
+        self.layout = compile_layout(regions, rows, cols)
+        self.regions = self.layout.regions
+        self.givens = dict(givens or {})
+        self.rows = self.layout.rows
+        self.cols = self.layout.cols
+        self.max_nogoods = max_nogoods
+        self.max_nogood_size = max_nogood_size
+        self.restart_nodes = restart_nodes
+        self.nodes = 0
+        self.timed_out = False
+        self.cancelled = False
+        self.restarts = 0
+        self.backjumps = 0
+        self.learned = 0
+        self.stats = SolveStats()
+
+    def solve(self, timeout_nodes: Optional[int]=None, randomize: bool=False,
+              propagation: bool=True, time_limit: Optional[float]=None,
+              cancel=None, progress=None, restarts: bool=True) -> Optional[Dict[Cell,int]]:
+        """
+        Première solution (dict cell->value) ou None si insoluble / budget
+        épuisé / annulé ; budgets, cancel et progress comme BitsetSolver.solve.
+        propagation : point fixe complet à la racine (sinon givens seuls)
+        restarts : redémarrages de Luby (randomize : valeurs aléatoires dès le départ)
+        """
+        for value in self._search(timeout_nodes, randomize, propagation, time_limit,
+                                  cancel, progress, restarts=restarts):
+            return {divmod(i, self.cols): value[i] for i in self.layout.cells}
+        return None
+
+    def count(self, limit: Optional[int]=2, timeout_nodes: Optional[int]=None,
+              time_limit: Optional[float]=None, propagation: bool=True,
+              cancel=None, progress=None) -> Optional[int]:
+        """Nombre de solutions plafonné à limit (sans redémarrage), None si un budget est épuisé avant."""
+        found = 0
+        for _ in self._search(timeout_nodes, propagation=propagation, time_limit=time_limit,
+                              cancel=cancel, progress=progress, restarts=False):
+            found += 1
+            if limit and found >= limit:
+                return found
+        if self.timed_out or self.cancelled:
+            return None
+        return found
+
+    def _search(self, timeout_nodes: Optional[int]=None, randomize: bool=False,
+                propagation: bool=True, time_limit: Optional[float]=None,
+                cancel=None, progress=None, restarts: bool=True):
+        """
+        Générateur : produit la liste value (indice -> valeur) à chaque
+        solution. Après une solution, les ensembles de conflit couvrent tous
+        les niveaux inférieurs (retour chronologique, pour l'énumération) et
+        ni apprentissage ni redémarrage n'ont plus lieu.
+        self.restarts, self.backjumps (niveaux sautés), self.learned (nogoods
+        appris) complètent self.stats.
+        """
+        self.nodes = 0
+        self.timed_out = False
+        self.cancelled = False
+        self.restarts = 0
+        self.backjumps = 0
+        self.learned = 0
+        start = time.monotonic()
+        budget = Budget(timeout_nodes, time_limit, cancel, progress, start)
+        stats = self.stats = SolveStats()
+        layout = self.layout
+        size = layout.size
+        peers = layout.peers
+        cells = layout.cells
+        n = len(size)
+        maxsize = max(size) if n else 0
+        base = maxsize + 1   # littéral (i, v) -> i * base + v
+
+        # racine : givens (et propagation) par le moteur bitset, niveau 0 permanent
+        root = BitsetSolver(layout, self.givens)
+        value = None
+        for value in root._search(propagation=propagation, root_only=True):
+            break
+        if value is None:
+            stats.wipeouts = root.stats.wipeouts
+            stats.elapsed = time.monotonic() - start
+            return
+        value = list(value)
+        domains = list(root._domains)
+
+        count = [0] * n
+        buckets: List[Set[int]] = [set() for _ in range(maxsize + 1)]
+        remaining = 0
+        for i in cells:
+            if not value[i]:
+                count[i] = _popcount(domains[i])
+                buckets[count[i]].add(i)
+                remaining += 1
+
+        level_of = [0] * n          # niveau d'assignation de i (0 : racine)
+        past_fc = [0] * n           # niveaux ayant retiré des valeurs de i
+        weight = [0] * n            # échecs impliquant i (départage du MRV)
+        cap = sum(size) + 1
+        trail_cell = [0] * cap
+        trail_mask = [0] * cap
+        trail_past = [0] * cap      # past_fc[p] avant le retrait, rétabli au dépilement
+        top = 0
+        cell_at = [0] * (remaining + 1)
+        todo_at = [0] * (remaining + 1)
+        mark_at = [0] * (remaining + 1)
+        conf = [0] * (remaining + 1)
+        depth = 0
+
+        # nogoods : id -> littéraux ; watch[littéral] -> ids qui le contiennent
+        store: "OrderedDict[int, Tuple[int, ...]]" = OrderedDict()
+        watch: Dict[int, Set[int]] = {}
+        next_id = 0
+        root_prunes: List[int] = []   # nogoods unitaires, appliqués au redémarrage
+        learning = True
+        restart_k = 1
+        restart_at = self.restart_nodes * luby(1) if restarts else 0
+        shuffle = randomize
+        restored = 0
+        backtracks = 0
+        max_depth = 0
+        wipeouts = 0
+
+        def finish():
+            stats.nodes = self.nodes
+            stats.backtracks = backtracks
+            stats.max_depth = max_depth
+            stats.propagations = restored + top
+            stats.wipeouts = wipeouts
+            stats.elapsed = time.monotonic() - start
+
+        def prune(p: int, bit: int, reason: int) -> bool:
+            # retire bit du domaine de p (non assignée), raison = masque de niveaux
+            nonlocal top
+            d = domains[p] ^ bit
+            domains[p] = d
+            k = count[p]
+            buckets[k].discard(p)
+            buckets[k-1].add(p)
+            count[p] = k - 1
+            trail_cell[top] = p
+            trail_mask[top] = bit
+            trail_past[top] = past_fc[p]
+            top += 1
+            past_fc[p] |= reason
+            return k > 1
+
+        def undo(mark: int):
+            # dépile le trail jusqu'à mark, raisons comprises
+            nonlocal top, restored
+            restored += top - mark
+            while top > mark:
+                top -= 1
+                p = trail_cell[top]
+                domains[p] |= trail_mask[top]
+                k = count[p]
+                buckets[k].discard(p)
+                buckets[k+1].add(p)
+                count[p] = k + 1
+                past_fc[p] = trail_past[top]
+
+        def learn(cs: int):
+            # nogood : les assignations des niveaux de cs ne tiennent pas ensemble
+            nonlocal next_id
+            if _popcount(cs) > self.max_nogood_size:
+                return
+            lits = []
+            while cs:
+                b = cs & -cs
+                cs ^= b
+                c = cell_at[b.bit_length() - 1]
+                lits.append(c * base + value[c])
+            self.learned += 1
+            if len(lits) == 1:
+                root_prunes.append(lits[0])
+                return
+            nid = next_id
+            next_id += 1
+            store[nid] = tuple(lits)
+            for lit in lits:
+                watch.setdefault(lit, set()).add(nid)
+            while len(store) > self.max_nogoods:
+                old, old_lits = store.popitem(last=False)
+                for lit in old_lits:
+                    watch[lit].discard(old)
+
+        while True:
+            # nouveau noeud
+            self.nodes += 1
+            if self.nodes >= budget.next and not budget.check(self.nodes, depth):
+                self.timed_out, self.cancelled = budget.timed_out, budget.cancelled
+                finish()
+                return
+
+            if restart_at and self.nodes >= restart_at and depth:
+                # redémarrage : retour à la racine, nogoods unitaires appliqués
+                self.restarts += 1
+                restart_k += 1
+                restart_at = self.nodes + self.restart_nodes * luby(restart_k)
+                shuffle = True
+                for l in range(1, depth + 1):
+                    c = cell_at[l]
+                    value[c] = 0
+                    buckets[count[c]].add(c)
+                    remaining += 1
+                undo(0)
+                depth = 0
+                for lit in root_prunes:
+                    c, v = divmod(lit, base)
+                    bit = 1 << (v - 1)
+                    if not value[c] and domains[c] & bit:
+                        if not prune(c, bit, 0):
+                            finish()
+                            return
+                top = 0   # retraits de la racine : permanents
+                root_prunes.clear()
+
+            if remaining == 0:
+                finish()
+                yield value
+                # énumération : retour chronologique, plus d'apprentissage
+                learning = False
+                restart_at = 0
+                for l in range(1, depth + 1):
+                    conf[l] |= (1 << l) - 2
+            else:
+                k = 1
+                while not buckets[k]:
+                    k += 1
+                bucket = buckets[k]
+                i = max(bucket, key=weight.__getitem__) if len(bucket) > 1 else next(iter(bucket))
+                bucket.discard(i)
+                remaining -= 1
+                depth += 1
+                if depth > max_depth:
+                    max_depth = depth
+                cell_at[depth] = i
+                todo_at[depth] = domains[i]
+                mark_at[depth] = top
+                conf[depth] = 0
+
+            # valeur suivante du niveau le plus profond, saut en arrière si épuisé
+            while depth:
+                L = depth
+                i = cell_at[L]
+                undo(mark_at[L])
+                value[i] = 0
+                todo = todo_at[L]
+                if not todo:
+                    backtracks += 1
+                    buckets[count[i]].add(i)
+                    remaining += 1
+                    cs = (conf[L] | past_fc[i]) & ~(1 << L) & ~1
+                    if not cs:
+                        depth = 0
+                        break
+                    h = cs.bit_length() - 1
+                    if learning:
+                        learn(cs)
+                    conf[h] |= cs & ~(1 << h)
+                    for l in range(L - 1, h, -1):
+                        c = cell_at[l]
+                        value[c] = 0
+                        buckets[count[c]].add(c)
+                        remaining += 1
+                    self.backjumps += L - 1 - h
+                    depth = h
+                    continue
+                if shuffle:
+                    bits = []
+                    t = todo
+                    while t:
+                        b = t & -t
+                        bits.append(b)
+                        t ^= b
+                    bit = random.choice(bits)
+                else:
+                    bit = todo & -todo
+                todo_at[L] = todo ^ bit
+                v = bit.bit_length()
+                value[i] = v
+                level_of[i] = L
+                here = 1 << L
+                ok = True
+                # forward checking
+                for p in peers[i]:
+                    if domains[p] & bit and not value[p]:
+                        if not prune(p, bit, here):
+                            conf[L] |= past_fc[p] & ~here
+                            weight[p] += 1
+                            weight[i] += 1
+                            wipeouts += 1
+                            ok = False
+                            break
+                # nogoods contenant (i, v)
+                ids = watch.get(i * base + v) if ok else None
+                if ids:
+                    for nid in list(ids):
+                        reason = 0
+                        open_lit = -1
+                        for lit in store[nid]:
+                            c, w = divmod(lit, base)
+                            if value[c] == w:
+                                reason |= 1 << level_of[c]
+                            elif value[c] or open_lit >= 0:
+                                break
+                            else:
+                                open_lit = lit
+                        else:
+                            store.move_to_end(nid)
+                            if open_lit < 0:
+                                # toutes les assignations du nogood sont faites
+                                conf[L] |= reason & ~here
+                                wipeouts += 1
+                                ok = False
+                                break
+                            c, w = divmod(open_lit, base)
+                            b = 1 << (w - 1)
+                            if domains[c] & b and not prune(c, b, reason):
+                                conf[L] |= past_fc[c] & ~here
+                                weight[c] += 1
+                                wipeouts += 1
+                                ok = False
+                                break
+                if ok:
+                    break
+            else:
+                finish()
+                return
+            if not depth:
+                finish()
+                return
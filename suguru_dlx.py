@@ -0,0 +1,278 @@
+# suguru_dlx.py
+"""
+Moteur Dancing Links (DLX, algorithme X de Knuth) pour le Suguru.
+
+Modélisation en couverture exacte :
+- colonnes primaires : "la cellule i reçoit une valeur" et
+  "la valeur v est placée dans la région R" (exactement une fois chacune)
+- colonnes secondaires : "la valeur v apparaît au plus une fois dans le
+  bloc 2x2 W" ; toute paire de cellules voisines (8 directions) tient dans
+  un bloc 2x2, ce qui encode la règle d'adjacence
+- lignes : (cellule i, valeur v) pour v dans 1..|région de i|
+
+La colonne choisie à chaque noeud est la colonne primaire de plus petite
+taille (heuristique S de Knuth). La recherche est itérative.
+
+Utilisé par suguru_solver.solve_puzzle(..., engine="dlx").
+"""
+
+from typing import Dict, Tuple, List, Optional
+import random
+import time
+
+from suguru_solver import Cell, grid_dims
+from suguru_stats import Budget, SolveStats
+
+
+class DLXSolver:
+    """Même interface que BitsetSolver : solve(), count(), nodes, timed_out, stats."""
+
+    def __init__(self, regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+                 rows: Optional[int]=None, cols: Optional[int]=None):
+        self.regions = regions
+        self.givens = dict(givens or {})
+        self.rows, self.cols = grid_dims(regions, rows, cols)
+        cols_ = self.cols
+
+        size = [0] * (self.rows * cols_)
+        region_idx: List[List[int]] = []
+        for cells in regions.values():
+            idx = [r*cols_ + c for (r,c) in cells]
+            region_idx.append(idx)
+            for i in idx:
+                size[i] = len(idx)
+        self.size = size
+        self.cells: List[int] = [i for i in range(len(size)) if size[i]]
+
+        # colonnes primaires : cellules puis (région, valeur)
+        ncol = 0
+        cell_col: Dict[int, int] = {}
+        for i in self.cells:
+            ncol += 1
+            cell_col[i] = ncol
+        region_col: Dict[int, int] = {}   # indice -> première colonne (valeur 1) de sa région
+        for idx in region_idx:
+            base = ncol + 1
+            ncol += len(idx)
+            for i in idx:
+                region_col[i] = base
+        self.n_primary = ncol
+
+        # colonnes secondaires : (bloc 2x2, valeur), créées à la demande
+        windows: List[List[int]] = []
+        for r in range(max(self.rows - 1, 1)):
+            for c in range(max(cols_ - 1, 1)):
+                w = [rr*cols_ + cc for rr in (r, r+1) for cc in (c, c+1)
+                     if rr < self.rows and cc < cols_ and size[rr*cols_ + cc]]
+                if len(w) >= 2:
+                    windows.append(w)
+        window_col: Dict[Tuple[int, int], int] = {}
+        cell_windows: Dict[int, List[int]] = {i: [] for i in self.cells}
+        for wi, w in enumerate(windows):
+            for i in w:
+                cell_windows[i].append(wi)
+        self.n_columns = ncol
+
+        # lignes (i, v) -> colonnes couvertes
+        self.matrix_rows: List[Tuple[int, int, Tuple[int, ...]]] = []
+        for i in self.cells:
+            for v in range(1, size[i] + 1):
+                row = [cell_col[i], region_col[i] + v - 1]
+                for wi in cell_windows[i]:
+                    key = (wi, v)
+                    if key not in window_col:
+                        self.n_columns += 1
+                        window_col[key] = self.n_columns
+                    row.append(window_col[key])
+                self.matrix_rows.append((i, v, tuple(row)))
+        self.row_of: Dict[Tuple[int, int], int] = {(i, v): k for k, (i, v, _) in enumerate(self.matrix_rows)}
+        self.nodes = 0
+        self.timed_out = False
+        self.cancelled = False
+        self.stats = SolveStats()
+
+    def solve(self, timeout_nodes: Optional[int]=None, randomize: bool=False,
+              time_limit: Optional[float]=None, cancel=None, progress=None) -> Optional[Dict[Cell,int]]:
+        """
+        Première solution (dict cell->value) ou None si insolvable / budget
+        épuisé / annulé ; cancel et progress comme pour BitsetSolver.solve.
+        """
+        for solution in self._search(timeout_nodes, randomize, time_limit, cancel, progress):
+            return solution
+        return None
+
+    def count(self, limit: Optional[int]=2, timeout_nodes: Optional[int]=None,
+              time_limit: Optional[float]=None, cancel=None, progress=None) -> Optional[int]:
+        """Nombre de solutions plafonné à limit, None si un budget est épuisé avant."""
+        found = 0
+        for _ in self._search(timeout_nodes, time_limit=time_limit, cancel=cancel, progress=progress):
+            found += 1
+            if limit and found >= limit:
+                return found
+        if self.timed_out or self.cancelled:
+            return None
+        return found
+
+    def _search(self, timeout_nodes: Optional[int]=None, randomize: bool=False,
+                time_limit: Optional[float]=None, cancel=None, progress=None):
+        """
+        Générateur : produit un dict cell->value par solution.
+        self.stats : noeuds, retours arrière, profondeur ; propagations =
+        colonnes couvertes, wipeouts = colonnes primaires vides rencontrées.
+        """
+        self.nodes = 0
+        self.timed_out = False
+        self.cancelled = False
+        start = time.monotonic()
+        stats = self.stats = SolveStats()
+
+        def finish():
+            stats.nodes = self.nodes
+            stats.elapsed = time.monotonic() - start
+        budget = Budget(timeout_nodes, time_limit, cancel, progress, start)
+        cols_ = self.cols
+        n_primary = self.n_primary
+        ncol = self.n_columns
+
+        # noeuds 0..ncol : racine et en-têtes de colonnes
+        L = list(range(-1, ncol))
+        R = list(range(1, ncol + 2))
+        L[0] = n_primary
+        R[n_primary] = 0
+        for c in range(n_primary + 1, ncol + 1):
+            L[c] = R[c] = c
+        U = list(range(ncol + 1))
+        D = list(range(ncol + 1))
+        C = list(range(ncol + 1))
+        S = [0] * (ncol + 1)
+        ROW = [-1] * (ncol + 1)
+
+        order = list(range(len(self.matrix_rows)))
+        if randomize:
+            random.shuffle(order)
+        for k in order:
+            _, _, row = self.matrix_rows[k]
+            first = len(L)
+            for col in row:
+                x = len(L)
+                L.append(x - 1 if x > first else x)
+                R.append(first)
+                if x > first:
+                    R[x - 1] = x
+                    L[first] = x
+                U.append(U[col])
+                D.append(col)
+                D[U[col]] = x
+                U[col] = x
+                C.append(col)
+                ROW.append(k)
+                S[col] += 1
+
+        def cover(c: int):
+            R[L[c]] = R[c]
+            L[R[c]] = L[c]
+            i = D[c]
+            while i != c:
+                j = R[i]
+                while j != i:
+                    D[U[j]] = D[j]
+                    U[D[j]] = U[j]
+                    S[C[j]] -= 1
+                    j = R[j]
+                i = D[i]
+
+        def uncover(c: int):
+            i = U[c]
+            while i != c:
+                j = L[i]
+                while j != i:
+                    S[C[j]] += 1
+                    D[U[j]] = j
+                    U[D[j]] = j
+                    j = L[j]
+                i = U[i]
+            R[L[c]] = c
+            L[R[c]] = c
+
+        # givens : lignes imposées, leurs colonnes sont couvertes d'avance
+        covered = set()
+        fixed: Dict[Cell, int] = {}
+        for (r,c), v in self.givens.items():
+            i = r*cols_ + c
+            if not (0 <= r < self.rows and 0 <= c < cols_) or not self.size[i]:
+                continue
+            k = self.row_of.get((i, v))
+            if k is None:
+                finish()
+                return
+            row = self.matrix_rows[k][2]
+            if covered.intersection(row):
+                finish()
+                return
+            covered.update(row)
+            fixed[(r,c)] = v
+            for col in row:
+                cover(col)
+
+        choice: List[int] = []
+        while True:
+            # nouveau noeud
+            self.nodes += 1
+            if self.nodes >= budget.next and not budget.check(self.nodes, len(choice)):
+                self.timed_out, self.cancelled = budget.timed_out, budget.cancelled
+                finish()
+                return
+            if R[0] == 0:
+                solution = dict(fixed)
+                for x in choice:
+                    i, v, _ = self.matrix_rows[ROW[x]]
+                    solution[divmod(i, cols_)] = v
+                finish()
+                yield solution
+            else:
+                # colonne primaire de plus petite taille
+                c = R[0]
+                best = c
+                best_size = S[c]
+                while c and best_size > 1:
+                    if S[c] < best_size:
+                        best = c
+                        best_size = S[c]
+                    c = R[c]
+                if best_size:
+                    cover(best)
+                    x = D[best]
+                    choice.append(x)
+                    if len(choice) > stats.max_depth:
+                        stats.max_depth = len(choice)
+                    j = R[x]
+                    while j != x:
+                        cover(C[j])
+                        stats.propagations += 1
+                        j = R[j]
+                    continue
+                stats.wipeouts += 1
+
+            # retour arrière : ligne suivante de la colonne la plus profonde
+            while choice:
+                x = choice[-1]
+                j = L[x]
+                while j != x:
+                    uncover(C[j])
+                    j = L[j]
+                x = D[x]
+                if x == C[x]:
+                    uncover(x)
+                    choice.pop()
+                    stats.backtracks += 1
+                    continue
+                choice[-1] = x
+                j = R[x]
+                while j != x:
+                    cover(C[j])
+                    stats.propagations += 1
+                    j = R[j]
+                break
+            else:
+                finish()
+                return
@@ -0,0 +1,272 @@
+# suguru_format.py
+"""
+Formats compacts pour stocker et partager des grilles Suguru.
+
+Enregistrement binaire (encode_puzzle / decode_puzzle) :
+- 3 octets : rows, cols, flags (bit 0 : étiquettes sur 2 octets, bit 1 : solution présente)
+- carte des régions : une étiquette par case (1 octet, 2 si plus de 255 régions),
+  régions numérotées dans l'ordre de lecture à partir de 1, 0 = hors région
+- givens : un quartet par case (0 = vide), deux cases par octet
+- solution (optionnelle) : même empaquetage que les givens
+
+Chaîne partageable (to_string / from_string) : l'enregistrement, compressé
+par zlib si c'est plus court, en base64 URL-safe sans '=' ; préfixe "r" (brut)
+ou "z" (zlib).
+
+Bibliothèque (write_library / PuzzleLibrary) : un fichier lu par mmap,
+accès direct à n'importe quelle grille sans charger le reste.
+- en-tête de 32 octets : magic b"SUGLIB1\\0", version, nombre de grilles,
+  position de l'index
+- les enregistrements, à la suite
+- l'index : 16 octets par grille (position, longueur, rows, cols, difficulté)
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from array import array
+import base64
+import mmap
+import struct
+import zlib
+
+from suguru_solver import Cell, grid_dims
+
+Puzzle = Tuple[Dict[int, List[Cell]], Dict[Cell,int], Optional[Dict[Cell,int]], int, int]
+
+_WIDE_LABELS = 1
+_HAS_SOLUTION = 2
+
+
+def _pack_nibbles(values: List[int]) -> bytes:
+    if len(values) % 2:
+        values = values + [0]
+    if any(v > 15 or v < 0 for v in values):
+        raise ValueError("valeurs limitées à 0..15 dans le format compact")
+    return bytes(values[k] | values[k+1] << 4 for k in range(0, len(values), 2))
+
+_LOW = bytes(b & 15 for b in range(256))
+_HIGH = bytes(b >> 4 for b in range(256))
+
+def _unpack_nibbles(data: bytes, n: int) -> bytearray:
+    data = bytes(data)
+    out = bytearray(2 * len(data))
+    out[0::2] = data.translate(_LOW)
+    out[1::2] = data.translate(_HIGH)
+    return out[:n]
+
+_CELLS: Dict[Tuple[int, int], List[Cell]] = {}
+
+def _cells(rows: int, cols: int) -> List[Cell]:
+    # cases (r,c) en ordre de lecture, partagées entre décodages
+    cells = _CELLS.get((rows, cols))
+    if cells is None:
+        cells = _CELLS[(rows, cols)] = [divmod(i, cols) for i in range(rows * cols)]
+    return cells
+
+
+def encode_puzzle(regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+                  solution: Optional[Dict[Cell,int]] = None, rows: Optional[int]=None,
+                  cols: Optional[int]=None) -> bytes:
+    """Encode une grille (et sa solution si fournie) en enregistrement binaire."""
+    rows, cols = grid_dims(regions, rows, cols)
+    if not (0 <= rows < 256 and 0 <= cols < 256):
+        raise ValueError("dimensions limitées à 255x255 dans le format compact")
+    n = rows * cols
+    owner = [-1] * n
+    for k, cells in enumerate(regions.values()):
+        for (r,c) in cells:
+            owner[r*cols + c] = k
+    # étiquettes dans l'ordre de lecture (indépendantes des ids d'origine)
+    relabel: Dict[int, int] = {}
+    labels = [relabel.setdefault(o, len(relabel) + 1) if o >= 0 else 0 for o in owner]
+    flags = 0
+    if len(relabel) > 255:
+        flags |= _WIDE_LABELS
+        label_bytes = array("H", labels).tobytes()
+    else:
+        label_bytes = bytes(labels)
+    grid = [0] * n
+    for (r,c), v in (givens or {}).items():
+        grid[r*cols + c] = v
+    out = bytes((rows, cols, flags | (_HAS_SOLUTION if solution else 0))) + label_bytes + _pack_nibbles(grid)
+    if solution:
+        grid = [0] * n
+        for (r,c), v in solution.items():
+            grid[r*cols + c] = v
+        out += _pack_nibbles(grid)
+    return out
+
+def decode_puzzle(data: bytes) -> Puzzle:
+    """
+    Décode un enregistrement binaire.
+    Retour: (regions, givens, solution ou None, rows, cols)
+    """
+    rows, cols, flags = data[0], data[1], data[2]
+    n = rows * cols
+    pos = 3
+    if flags & _WIDE_LABELS:
+        labels = array("H")
+        labels.frombytes(bytes(data[pos:pos + 2*n]))
+        pos += 2 * n
+    else:
+        labels = data[pos:pos + n]
+        pos += n
+    cells = _cells(rows, cols)
+    regions: Dict[int, List[Cell]] = {}
+    for cell, k in zip(cells, labels):
+        if k:
+            members = regions.get(k - 1)
+            if members is None:
+                regions[k - 1] = [cell]
+            else:
+                members.append(cell)
+    half = (n + 1) // 2
+    grid = _unpack_nibbles(data[pos:pos + half], n)
+    givens = {cell: v for cell, v in zip(cells, grid) if v}
+    solution = None
+    if flags & _HAS_SOLUTION:
+        grid = _unpack_nibbles(data[pos + half:pos + 2*half], n)
+        solution = {cell: v for cell, v in zip(cells, grid) if v}
+    return regions, givens, solution, rows, cols
+
+
+def _record_length(data: bytes) -> int:
+    """Longueur qu'impliquent l'en-tête (rows, cols, flags) d'un enregistrement."""
+    rows, cols, flags = data[0], data[1], data[2]
+    n = rows * cols
+    half = (n + 1) // 2
+    labels = 2 * n if flags & _WIDE_LABELS else n
+    return 3 + labels + half * (2 if flags & _HAS_SOLUTION else 1)
+
+
+def to_string(regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+              solution: Optional[Dict[Cell,int]] = None, rows: Optional[int]=None,
+              cols: Optional[int]=None) -> str:
+    """Chaîne courte, utilisable telle quelle dans une URL."""
+    raw = encode_puzzle(regions, givens, solution, rows, cols)
+    packed = zlib.compress(raw, 9)
+    prefix, data = ("z", packed) if len(packed) < len(raw) else ("r", raw)
+    return prefix + base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+def from_string(text: str) -> Puzzle:
+    """Inverse de to_string ; ValueError si la chaîne est invalide."""
+    text = text.strip()
+    if not text or text[0] not in "rz":
+        raise ValueError("chaîne de grille invalide")
+    try:
+        data = base64.urlsafe_b64decode(text[1:] + "=" * (-len(text[1:]) % 4))
+        if text[0] == "z":
+            data = zlib.decompress(data)
+        # enregistrement tronqué, vide ou suivi d'octets en trop : refusé
+        # plutôt que décodé en grille partielle
+        if len(data) < 3 or not data[0] or not data[1] or data[2] & ~(_WIDE_LABELS | _HAS_SOLUTION):
+            raise ValueError("en-tête invalide")
+        if len(data) != _record_length(data):
+            raise ValueError(f"{len(data)} octets au lieu de {_record_length(data)}")
+        return decode_puzzle(data)
+    except (zlib.error, IndexError, ValueError) as e:
+        raise ValueError(f"chaîne de grille invalide : {e}")
+
+
+# ==============================
+# Bibliothèque de grilles (mmap)
+# ==============================
+
+MAGIC = b"SUGLIB1\0"
+VERSION = 1
+_HEADER = struct.Struct("<8sIxxxxQQ")   # magic, version, count, index_offset (32 octets)
+_ENTRY = struct.Struct("<QIBBBx")       # offset, length, rows, cols, difficulty (16 octets)
+
+def write_library(path: str, puzzles: Iterable[tuple]) -> int:
+    """
+    Écrit une bibliothèque ; puzzles : itérable de
+    (regions, givens, solution, difficulty) — solution peut être None,
+    difficulty est un entier 0..255 (ex. rang dans suguru_generator.DIFFICULTIES).
+    Les grilles sont écrites au fil de l'eau, seul l'index reste en mémoire.
+    Retour: nombre de grilles écrites
+    """
+    index = bytearray()
+    count = 0
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        offset = _HEADER.size
+        for regions, givens, solution, difficulty in puzzles:
+            record = encode_puzzle(regions, givens, solution)
+            f.write(record)
+            index += _ENTRY.pack(offset, len(record), record[0], record[1], difficulty)
+            offset += len(record)
+            count += 1
+        f.write(index)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, count, offset))
+    return count
+
+class PuzzleLibrary:
+    """
+    Lecture d'une bibliothèque par mmap : lib[i] décode la grille i sans
+    lire les autres ; find(rows, cols, difficulty) liste les ids correspondants.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} : bibliothèque vide")
+        magic, version, count, index_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} : pas une bibliothèque Suguru (version {VERSION})")
+        self.count = count
+        self._index_offset = index_offset
+        self._by_kind: Optional[Dict[Tuple[int, int, int], array]] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def entry(self, pid: int) -> Tuple[int, int, int, int, int]:
+        """(offset, longueur, rows, cols, difficulté) de la grille pid."""
+        if not 0 <= pid < self.count:
+            raise IndexError(pid)
+        return _ENTRY.unpack_from(self._map, self._index_offset + pid * _ENTRY.size)
+
+    def record(self, pid: int) -> bytes:
+        """Enregistrement binaire brut de la grille pid."""
+        offset, length, _, _, _ = self.entry(pid)
+        return self._map[offset:offset + length]
+
+    def __getitem__(self, pid: int) -> Puzzle:
+        return decode_puzzle(self.record(pid))
+
+    def find(self, rows: Optional[int]=None, cols: Optional[int]=None,
+             difficulty: Optional[int]=None) -> List[int]:
+        """Ids des grilles de ces dimensions / difficulté (None = toutes)."""
+        if self._by_kind is None:
+            # index secondaire construit au premier appel (un passage sur l'index)
+            by_kind: Dict[Tuple[int, int, int], array] = {}
+            view = self._map[self._index_offset:self._index_offset + self.count * _ENTRY.size]
+            for pid, (_, _, r, c, d) in enumerate(_ENTRY.iter_unpack(view)):
+                ids = by_kind.get((r, c, d))
+                if ids is None:
+                    ids = by_kind[(r, c, d)] = array("L")
+                ids.append(pid)
+            self._by_kind = by_kind
+        found: List[int] = []
+        for (r, c, d), ids in self._by_kind.items():
+            if (rows is None or r == rows) and (cols is None or c == cols) \
+                    and (difficulty is None or d == difficulty):
+                found.extend(ids)
+        found.sort()
+        return found
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,112 +1,649 @@
 # suguru_generator.py
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import random
-from suguru_solver import SuguruPuzzle, Cell
-from collections import defaultdict
-from copy import deepcopy
-
-class SuguruPuzzle:
-    """Classe minimaliste pour gérer la grille Suguru et le solveur."""
-    def __init__(self, rows, cols, regions, givens={}):
-        self.rows = rows
-        self.cols = cols
-        self.regions = regions  # dict: region_id -> list of (r,c)
-        self.givens = givens
-        self.grid = [[0]*cols for _ in range(rows)]
-        for (r,c), v in givens.items():
-            self.grid[r][c] = v
-
-    def is_valid(self, r, c, val):
-        # Vérifie ligne, colonne et région
-        for i in range(self.cols):
-            if self.grid[r][i] == val:
-                return False
-        for i in range(self.rows):
-            if self.grid[i][c] == val:
+from suguru_solver import BitsetSolver, Cell, SolveStats
+
+def _partition_area(rows, cols, area, lo, hi, mode, rng):
+    """
+    Partitionne les indices de `area` (r*cols+c) en régions connexes de
+    tailles visées dans [lo, hi], sans déborder de la zone.
+    Retour: list de listes d'indices
+    """
+    # owner : -2 hors zone, -1 libre, sinon id de région
+    owner = [-2] * (rows * cols)
+    for i in area:
+        owner[i] = -1
+
+    def grid_neighbors(i):
+        r, c = divmod(i, cols)
+        if r > 0: yield i - cols
+        if r < rows - 1: yield i + cols
+        if c > 0: yield i - 1
+        if c < cols - 1: yield i + 1
+
+    # 1) croissance aléatoire depuis chaque cellule libre, en ordre de lecture
+    #    (les régions avancent dans la zone vierge, peu de trous isolés)
+    members = []          # région -> indices (valable pour les racines)
+    for start in sorted(area):
+        if owner[start] != -1:
+            continue
+        rid = len(members)
+        target = int(round(rng.triangular(lo, hi, mode))) if hi > lo else hi
+        owner[start] = rid
+        group = [start]
+        frontier = [start]
+        while frontier and len(group) < target:
+            k = rng.randrange(len(frontier))
+            f = frontier[k]
+            free = [j for j in grid_neighbors(f) if owner[j] == -1]
+            if not free:
+                frontier[k] = frontier[-1]
+                frontier.pop()
+                continue
+            # préfère la case libre la plus enclavée : évite de laisser des trous
+            j = min(free, key=lambda x: (sum(1 for y in grid_neighbors(x) if owner[y] == -1), rng.random()))
+            owner[j] = rid
+            group.append(j)
+            frontier.append(j)
+        members.append(group)
+
+    # 2) union-find sur les régions
+    parent = list(range(len(members)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def connected_without(cells, removed):
+        rest = [i for i in cells if i != removed]
+        if not rest:
+            return False
+        seen = {rest[0]}
+        todo = [rest[0]]
+        rest_set = set(rest)
+        while todo:
+            i = todo.pop()
+            for j in grid_neighbors(i):
+                if j in rest_set and j not in seen:
+                    seen.add(j)
+                    todo.append(j)
+        return len(seen) == len(rest)
+
+    # 3) réparation des régions trop petites (chaque examen est en O(hi))
+    for rid in range(len(members)):
+        if find(rid) != rid:
+            continue
+        while len(members[rid]) < lo:
+            # voisines de la région, en ordre aléatoire
+            adjacent = {}
+            for i in members[rid]:
+                for j in grid_neighbors(i):
+                    if owner[j] < 0:
+                        continue
+                    other = find(owner[j])
+                    if other != rid:
+                        adjacent.setdefault(other, []).append(j)
+            if not adjacent:
+                break
+            choices = list(adjacent.items())
+            rng.shuffle(choices)
+            stolen = False
+            for other, border in choices:
+                if len(members[other]) <= lo:
+                    continue
+                for j in border:
+                    if j in members[other] and connected_without(members[other], j):
+                        members[other].remove(j)
+                        members[rid].append(j)
+                        owner[j] = rid
+                        stolen = True
+                        break
+                if stolen:
+                    break
+            if stolen:
+                continue
+            other = min(choices, key=lambda item: len(members[item[0]]))[0]
+            if len(members[rid]) + len(members[other]) > hi:
+                fitting = [o for o, _ in choices if len(members[rid]) + len(members[o]) <= hi]
+                if not fitting:
+                    break
+                other = fitting[0]
+            # union par taille : la plus petite liste rejoint la plus grande
+            big, small = (rid, other) if len(members[rid]) >= len(members[other]) else (other, rid)
+            parent[small] = big
+            members[big].extend(members[small])
+            members[small] = []
+            if big != rid:
+                break
+
+    groups = [members[rid] for rid in range(len(members)) if find(rid) == rid]
+    return _enforce_min_size(rows, cols, groups, lo, hi, rng)
+
+def _enforce_min_size(rows, cols, groups, lo, hi, rng):
+    """
+    Complète les régions de moins de lo cases que l'étape 3 de
+    _partition_area laisse quand la fourchette [lo, hi] est étroite (aucune
+    voisine à voler ni à fusionner) :
+
+    - une case arrive de proche en proche depuis la région la plus proche
+      qui en a plus de lo : chaque région du chemin en reçoit une et en
+      cède une à la suivante en restant connexe, et garde donc sa taille
+    - sinon la petite région est dissoute : ses cases partent de même vers
+      les régions les plus proches qui ont encore de la place sous hi
+
+    Une région qu'aucune des deux ne corrige reste trop petite (zone trop
+    petite ou trop étroite pour la fourchette demandée).
+    Retour: list de listes d'indices
+    """
+    owner = {}
+    for k, group in enumerate(groups):
+        for i in group:
+            owner[i] = k
+    sets = [set(group) for group in groups]
+    log = []   # (case, région d'origine), pour annuler
+
+    def grid_neighbors(i):
+        r, c = divmod(i, cols)
+        for j, ok in ((i - cols, r > 0), (i + cols, r < rows - 1), (i - 1, c > 0), (i + 1, c < cols - 1)):
+            if ok and j in owner:
+                yield j
+
+    def connected(cells):
+        if not cells:
+            return False
+        start = next(iter(cells))
+        seen = {start}
+        todo = [start]
+        while todo:
+            for j in grid_neighbors(todo.pop()):
+                if j in cells and j not in seen:
+                    seen.add(j)
+                    todo.append(j)
+        return len(seen) == len(cells)
+
+    def move(i, dst):
+        log.append((i, owner[i]))
+        sets[owner[i]].discard(i)
+        sets[dst].add(i)
+        owner[i] = dst
+
+    def undo(mark):
+        while len(log) > mark:
+            i, src = log.pop()
+            sets[owner[i]].discard(i)
+            sets[src].add(i)
+            owner[i] = src
+
+    def route(k, push, blocked):
+        # plus court chemin de régions entre k et une région qui peut céder
+        # une case (push=False : plus de lo cases) ou en recevoir une
+        # (push=True : moins de hi), sans les passages (donneuse,
+        # receveuse) qui ont déjà échoué. Retour: None sans chemin,
+        # False si le chemin échoue (passage bloqué, rien n'a bougé)
+        prev = {k: None}
+        queue = [k]
+        end = None
+        for a in queue:
+            if a != k and (len(sets[a]) < hi if push else len(sets[a]) > lo):
+                end = a
+                break
+            nexts = list({owner[j] for i in sets[a] for j in grid_neighbors(i)} - {a})
+            rng.shuffle(nexts)
+            for b in nexts:
+                if b not in prev and ((a, b) if push else (b, a)) not in blocked:
+                    prev[b] = a
+                    queue.append(b)
+        if end is None:
+            return None
+        path = [end]
+        while prev[path[-1]] is not None:
+            path.append(prev[path[-1]])
+        path.reverse()
+        # chaque région intermédiaire reçoit sa case avant de céder la sienne
+        steps = list(zip(path, path[1:])) if push else list(zip(path[1:], path))[::-1]
+        mark = len(log)
+        for giver, receiver in steps:
+            cands = [i for i in sets[giver] if any(owner[j] == receiver for j in grid_neighbors(i))
+                     and (giver == k or connected(sets[giver] - {i}))]
+            if not cands:
+                undo(mark)
+                blocked.add((giver, receiver))
                 return False
-        # Vérifie la région
-        for rid, cells in self.regions.items():
-            if (r,c) in cells:
-                for (rr,cc) in cells:
-                    if self.grid[rr][cc] == val:
-                        return False
+            move(rng.choice(cands), receiver)
         return True
 
-    def solve_region(self, cells, idx=0):
-        if idx >= len(cells):
+    for _ in range(len(groups)):
+        small = sorted((k for k in range(len(groups)) if 0 < len(sets[k]) < lo),
+                       key=lambda k: len(sets[k]))
+        progress = False
+        for k in small:
+            blocked = set()
+            while 0 < len(sets[k]) < lo:
+                done = route(k, False, blocked)
+                if done is None:
+                    break
+                progress |= done
+            if 0 < len(sets[k]) < lo:
+                mark = len(log)
+                blocked = set()
+                while sets[k]:
+                    done = route(k, True, blocked)
+                    if done is None:
+                        undo(mark)
+                        break
+                progress |= not sets[k]
+        if not progress:
+            break
+    return [sorted(cells) for cells in sets if cells]
+
+def _size_params(max_region_size, min_region_size, mean_region_size):
+    hi = max(1, max_region_size)
+    lo = max(1, min(min_region_size, hi))
+    mean = (lo + hi) / 2 if mean_region_size is None else min(max(mean_region_size, lo), hi)
+    # mode de la loi triangulaire(lo, hi, mode) dont la moyenne vaut mean
+    mode = min(max(3 * mean - lo - hi, lo), hi)
+    return lo, hi, mode
+
+def random_partition(rows, cols, max_region_size, min_region_size=2, mean_region_size=None, seed=None):
+    """
+    Génère une partition aléatoire de la grille en régions connexes, en temps
+    linéaire : tableau plat owner[i] (indice r*cols+c -> région) et
+    union-find sur les régions pour les fusions.
+
+    - tailles visées entre min_region_size et max_region_size, tirées selon une
+      loi triangulaire de moyenne mean_region_size (défaut : milieu de l'intervalle)
+    - les régions trop petites volent une cellule à une voisine (si celle-ci
+      reste connexe et assez grande) ou fusionnent avec une voisine ; si la
+      fourchette est trop étroite pour cela, une case leur arrive de proche
+      en proche ou elles sont dissoutes (_enforce_min_size). min_region_size
+      n'est manqué que si la grille ne peut pas être découpée ainsi
+    - seed : graine d'un random.Random dédié (sinon le module random global)
+
+    Retour: dict region_id -> list of (r,c)
+    """
+    rng = random.Random(seed) if seed is not None else random
+    lo, hi, mode = _size_params(max_region_size, min_region_size, mean_region_size)
+    groups = _partition_area(rows, cols, range(rows * cols), lo, hi, mode, rng)
+    # renumérotation dans l'ordre de lecture de la grille
+    groups.sort(key=min)
+    return {rid: [divmod(i, cols) for i in sorted(group)] for rid, group in enumerate(groups)}
+
+def region_neighbors(regions, rid) -> List[int]:
+    """Régions touchant `rid` (8 directions : elles contraignent ses valeurs)."""
+    owner = {cell: k for k, cells in regions.items() for cell in cells}
+    found = set()
+    for (r,c) in regions[rid]:
+        for dr in (-1,0,1):
+            for dc in (-1,0,1):
+                k = owner.get((r+dr, c+dc))
+                if k is not None and k != rid:
+                    found.add(k)
+    return sorted(found)
+
+def _orthogonal(cell, cells):
+    r, c = cell
+    return [n for n in ((r-1, c), (r+1, c), (r, c-1), (r, c+1)) if n in cells]
+
+def _connected(cells) -> bool:
+    cells = set(cells)
+    if not cells:
+        return False
+    start = next(iter(cells))
+    seen = {start}
+    todo = [start]
+    while todo:
+        for n in _orthogonal(todo.pop(), cells):
+            if n not in seen:
+                seen.add(n)
+                todo.append(n)
+    return len(seen) == len(cells)
+
+# taille moyenne visée avant remplissage (heuristique) : chaque valeur 1..4
+# occupe au plus un quart des cases (4 valeurs distinctes par carré 2x2) ;
+# en pratique, une partition de moyenne proche de 4 échoue presque toujours,
+# sans que ce soit une impossibilité prouvée
+_FILL_MEAN = 4.5
+
+def _merge_region(regions, owner, rid, max_region_size, rng) -> bool:
+    """
+    Fusionne sur place la région rid avec sa plus petite voisine (orthogonale)
+    si la somme tient dans max_region_size. Retour: False sinon
+    """
+    cells = regions[rid]
+    others = {owner[n] for cell in cells for n in _orthogonal(cell, owner)} - {rid}
+    for other in sorted(others, key=lambda k: (len(regions[k]), rng.random())):
+        if len(cells) + len(regions[other]) <= max_region_size:
+            for cell in regions.pop(other):
+                owner[cell] = rid
+                cells.append(cell)
             return True
-        r,c = cells[idx]
-        max_val = len(cells)
-        for val in range(1, max_val+1):
-            if self.is_valid(r, c, val):
-                self.grid[r][c] = val
-                if self.solve_region(cells, idx+1):
-                    return True
-                self.grid[r][c] = 0
+    return False
+
+def _dissolve_region(regions, owner, rid, max_region_size, rng) -> bool:
+    """
+    Supprime sur place la région rid en donnant chacune de ses cases à une
+    voisine (orthogonale) qui a encore de la place sous max_region_size.
+    Retour: False (et rien n'est modifié) si toutes ne peuvent être données
+    """
+    left = list(regions[rid])
+    moved = []
+    while left:
+        options = [(cell, owner[n]) for cell in left for n in _orthogonal(cell, owner)
+                   if owner[n] != rid and len(regions[owner[n]]) < max_region_size]
+        if not options:
+            for cell, other in moved:
+                regions[other].remove(cell)
+                owner[cell] = rid
+            return False
+        cell, other = min(options, key=lambda o: (len(regions[o[1]]), rng.random()))
+        left.remove(cell)
+        regions[other].append(cell)
+        owner[cell] = other
+        moved.append((cell, other))
+    del regions[rid]
+    return True
+
+def _grow_region(regions, owner, rid, max_region_size, min_region_size, rng) -> bool:
+    """
+    Agrandit la région rid sur place : fusion (_merge_region) si possible,
+    sinon vol d'une case à une voisine qui reste connexe et d'au moins
+    min_region_size cases. Retour: False si rid ne peut pas grandir
+    """
+    cells = regions[rid]
+    if len(cells) >= max_region_size:
         return False
+    if _merge_region(regions, owner, rid, max_region_size, rng):
+        return True
+    border = [n for cell in cells for n in _orthogonal(cell, owner) if owner[n] != rid]
+    rng.shuffle(border)
+    for n in border:
+        other = owner[n]
+        rest = [cell for cell in regions[other] if cell != n]
+        if len(rest) >= max(min_region_size, 1) and _connected(rest):
+            regions[other] = rest
+            owner[n] = rid
+            cells.append(n)
+            return True
+    return False
 
-    def solve(self, timeout_nodes=200000):
-        # Remplit toutes les régions une par une
-        for rid, cells in self.regions.items():
-            if not self.solve_region(cells):
-                return None
-        solution = {}
-        for r in range(self.rows):
-            for c in range(self.cols):
-                solution[(r,c)] = self.grid[r][c]
-        return solution
-        
-        
-def random_partition(rows, cols, max_region_size):
-    """Génère une partition aléatoire simple en backtracking pour toutes les cellules"""
-    cells = [(r,c) for r in range(rows) for c in range(cols)]
-    random.shuffle(cells)
-    regions = {}
-    region_id = 0
-
-    def neighbors(cell, taken):
-        r,c = cell
-        nbrs = [(r+dr,c+dc) for dr,dc in [(-1,0),(1,0),(0,-1),(0,1)]]
-        return [n for n in nbrs if n in cells and n not in taken]
-
-    while cells:
-        start = cells.pop()
-        group = [start]
-        frontier = [start]
-        while len(group) < max_region_size and frontier:
-            f = frontier.pop()
-            for n in neighbors(f, group):
-                if n not in group:
-                    group.append(n)
-                    frontier.append(n)
-                    if len(group) >= max_region_size:
-                        break
-        for g in group:
-            if g in cells:
-                cells.remove(g)
-        regions[region_id] = group
-        region_id += 1
+def _blocked(sizes: List[int]) -> bool:
+    # 4 cases d'un carré 2x2 se touchent : il leur faut 4 valeurs distinctes,
+    # donc (Hall) la k-ième plus petite région doit avoir au moins k cases
+    return any(s < k for k, s in enumerate(sorted(sizes), 1))
+
+def repair_blocks(regions, rows, cols, max_region_size, min_region_size=2, seed=None):
+    """
+    Corrige, sans appeler le solveur, deux obstacles au remplissage :
+
+    - trop de régions : chacune contient un 1 et deux 1 ne se touchent pas,
+      donc au plus ceil(rows/2) * ceil(cols/2) régions (borne certaine) ;
+      on vise de plus au plus rows*cols / _FILL_MEAN régions, seuil
+      heuristique au-delà duquel le remplissage échoue presque toujours ;
+      les plus petites fusionnent avec une voisine jusqu'à passer sous
+      ces bornes
+    - carrés 2x2 impossibles (régions trop petites pour 4 valeurs
+      distinctes, obstacle certain) : la plus petite région du carré
+      grandit (_grow_region)
+
+    jusqu'à ce qu'aucun obstacle ne reste ou qu'aucune région en cause ne
+    puisse plus grandir.
+    Retour: nouveau dict region_id -> list of (r,c)
+    """
+    rng = random.Random(seed) if seed is not None else random
+    regions = {rid: list(cells) for rid, cells in regions.items()}
+    owner = {cell: rid for rid, cells in regions.items() for cell in cells}
+    bound = min(((rows + 1) // 2) * ((cols + 1) // 2), int(rows * cols / _FILL_MEAN))
+    while len(regions) > bound:
+        order = sorted(regions, key=lambda k: (len(regions[k]), rng.random()))
+        if not any(_merge_region(regions, owner, rid, max_region_size, rng) or
+                   _dissolve_region(regions, owner, rid, max_region_size, rng) for rid in order):
+            break
+    stuck = set()
+    for _ in range(rows * cols):
+        square = None
+        for r in range(rows - 1):
+            for c in range(cols - 1):
+                quad = [(r, c), (r, c+1), (r+1, c), (r+1, c+1)]
+                if (r, c) not in stuck and all(q in owner for q in quad) and \
+                        _blocked([len(regions[owner[q]]) for q in quad]):
+                    square = quad
+                    break
+            if square:
+                break
+        if square is None:
+            break
+        rids = sorted({owner[q] for q in square}, key=lambda k: (len(regions[k]), rng.random()))
+        if not any(_grow_region(regions, owner, rid, max_region_size, min_region_size, rng) for rid in rids):
+            stuck.add(square[0])
     return regions
 
-def generate_puzzle(rows:int=8, cols:int=8, max_region_size:int=5, max_tries:int=10000, seed=None):
+def _cluster_fillable(regions, rid, local_nodes: int=2000) -> bool:
+    """
+    Condition nécessaire : la région rid et ses voisines, extraites et
+    recadrées sur leur rectangle englobant, admettent un remplissage.
+    Un budget épuisé compte comme un succès (le solveur global tranchera).
     """
-    Génère une grille Suguru valide en utilisant backtracking robuste.
+    ids = [rid] + region_neighbors(regions, rid)
+    r0 = min(r for k in ids for (r,c) in regions[k])
+    c0 = min(c for k in ids for (r,c) in regions[k])
+    sub = {k: [(r - r0, c - c0) for (r,c) in regions[k]] for k in ids}
+    solver = BitsetSolver(sub)
+    return solver.solve(timeout_nodes=local_nodes, propagation=True) is not None or solver.timed_out
+
+def _repair_cluster(regions, rid, rows, cols, max_region_size, min_region_size) -> List[int]:
+    """
+    Répare sur place le groupe qui bloque (rid et ses voisines) : moins de
+    régions d'abord (fusion, dissolution de la plus petite), sinon une région
+    plus grande (vol de case) ; si rien ne bouge, le groupe est redécoupé en
+    régions d'au moins max_region_size - 1 cases.
+    Retour: ids des régions modifiées ou créées, encore présentes
+    """
+    cluster = sorted([rid] + region_neighbors(regions, rid),
+                     key=lambda k: (len(regions[k]), random.random()))
+    before = set(regions)
+    owner = {c: k for k, cells in regions.items() for c in cells}
+    if not any(_merge_region(regions, owner, k, max_region_size, random) or
+               _dissolve_region(regions, owner, k, max_region_size, random) for k in cluster) and \
+            not any(_grow_region(regions, owner, k, max_region_size, min_region_size, random)
+                    for k in cluster):
+        area = [r*cols + c for k in cluster for (r,c) in regions.pop(k)]
+        hi = max_region_size
+        lo = max(1, min(min_region_size, hi), hi - 1)
+        next_id = max(before) + 1
+        for k, group in enumerate(_partition_area(rows, cols, area, lo, hi, hi, random)):
+            regions[next_id + k] = [divmod(i, cols) for i in sorted(group)]
+    # voisines comprises : leurs groupes ont changé aussi
+    touched = [k for k in cluster if k in regions] + [k for k in regions if k not in before]
+    return sorted({j for k in touched for j in [k] + region_neighbors(regions, k)})
+
+def _window_pass(regions, rows, cols, max_region_size, min_region_size, size: int=8,
+                 local_nodes: Optional[int]=None, tries: int=6):
+    """
+    Essaie de remplir des fenêtres size x size (pas size/2 : elles se
+    chevauchent) avec toutes les régions qui les touchent ; une fenêtre
+    prouvée impossible fait réparer le groupe de sa région la plus en
+    échec (_repair_cluster), jusqu'à tries fois. Attrape les obstacles
+    trop étendus pour _cluster_fillable sans payer une recherche globale.
+    local_nodes : budget par fenêtre (défaut : 4 noeuds par case)
+    """
+    step = max(1, size // 2)
+    for r0 in range(0, max(rows - size, 0) + step, step):
+        for c0 in range(0, max(cols - size, 0) + step, step):
+            for _ in range(tries):
+                owner = {c: k for k, cells in regions.items() for c in cells}
+                ids = sorted({owner[(r, c)] for r in range(r0, min(r0 + size, rows))
+                              for c in range(c0, min(c0 + size, cols)) if (r, c) in owner})
+                if not ids:
+                    break
+                top = min(r for k in ids for (r,c) in regions[k])
+                left = min(c for k in ids for (r,c) in regions[k])
+                solver = BitsetSolver({k: [(r - top, c - left) for (r,c) in regions[k]] for k in ids})
+                budget = local_nodes or 4 * len(solver.cells)
+                if solver.solve(timeout_nodes=budget, randomize=True, propagation=True) is not None \
+                        or solver.timed_out:
+                    break
+                culprit = max(solver.cells, key=lambda i: (solver.conflicts[i], random.random()))
+                r, c = divmod(culprit, solver.cols)
+                _repair_cluster(regions, owner[(r + top, c + left)], rows, cols,
+                                max_region_size, min_region_size)
+
+def _check_clusters(regions, todo, rows, cols, max_region_size, min_region_size,
+                    local_nodes: int, checks: int) -> int:
+    """
+    Vérifie (_cluster_fillable) les régions de todo, et répare puis
+    revérifie les groupes qui bloquent, en au plus checks appels au solveur.
+    Retour: appels restants
+    """
+    todo = sorted(todo)
+    while todo and checks > 0:
+        rid = todo.pop()
+        if rid not in regions:
+            continue
+        checks -= 1
+        if not _cluster_fillable(regions, rid, local_nodes):
+            todo.extend(_repair_cluster(regions, rid, rows, cols, max_region_size, min_region_size))
+    return checks
+
+def fill_regions(regions, rows, cols, max_region_size, min_region_size=2,
+                 max_tries: int=50, fill_nodes: Optional[int]=None, local_nodes: int=2000):
+    """
+    Remplit une partition avec le vrai solveur (randomize=True + propagation).
+
+    Avant tout remplissage, les obstacles certains sont corrigés sans
+    solveur (repair_blocks : trop de régions, carrés 2x2 impossibles), puis
+    chaque région est essayée avec ses voisines (_cluster_fillable, petite
+    recherche bornée par local_nodes) ; un groupe qui bloque est réparé
+    (_repair_cluster) et revérifié. Sur les grandes grilles, des fenêtres
+    8x8 sont ensuite remplies à part (_window_pass) pour trouver les
+    obstacles plus étendus. Si le remplissage global échoue encore,
+    le groupe de la région la plus souvent impliquée dans les échecs
+    (BitsetSolver.conflicts) est réparé de même, et revérifié localement
+    avant l'essai suivant. Le reste de la grille ne bouge pas.
+
+    Coût borné : au plus max_tries remplissages globaux de fill_nodes noeuds
+    chacun (défaut : 2 par case ; un remplissage qui aboutit en demande
+    rarement plus d'un par case, un essai court suivi d'une réparation
+    coûte moins qu'une longue recherche), et au plus 10 vérifications
+    locales par région au total.
+
+    Retour: (regions, solution) ou None
+    """
+    if fill_nodes is None:
+        fill_nodes = 2 * rows * cols
+    regions = repair_blocks(regions, rows, cols, max_region_size, min_region_size)
+    checks = _check_clusters(regions, regions, rows, cols, max_region_size, min_region_size,
+                             local_nodes, 10 * len(regions))
+    if rows > 8 or cols > 8:
+        _window_pass(regions, rows, cols, max_region_size, min_region_size)
+    for attempt in range(max_tries):
+        solver = BitsetSolver(regions, rows=rows, cols=cols)
+        solution = solver.solve(timeout_nodes=fill_nodes, randomize=True, propagation=True)
+        if solution:
+            return regions, solution
+        # groupe qui bloque : la région qui cumule le plus d'échecs et ses voisines
+        culprit = max(solver.cells, key=lambda i: (solver.conflicts[i], random.random()))
+        cell = divmod(culprit, cols)
+        rid = next(k for k, cells in regions.items() if cell in cells)
+        touched = _repair_cluster(regions, rid, rows, cols, max_region_size, min_region_size)
+        regions = repair_blocks(regions, rows, cols, max_region_size, min_region_size)
+        checks = _check_clusters(regions, [k for k in touched if k in regions], rows, cols,
+                                 max_region_size, min_region_size, local_nodes, checks)
+    return None
+
+DIFFICULTIES = ("easy", "hard")
+
+def dig_puzzle(regions, solution, rows=None, cols=None, target_givens: Optional[int]=None,
+               difficulty: str="hard", probe_nodes: Optional[int]=2000, seed=None) -> Dict[Cell,int]:
+    """
+    Part de la solution complète et retire les givens un par un (ordre
+    aléatoire) tant que la grille reste à solution unique.
+
+    Un seul BitsetSolver est construit et réutilisé pour toutes les sondes.
+    La grille courante a pour unique solution `solution` ; retirer la case g
+    garde l'unicité ssi aucune solution n'a une autre valeur en g : une sonde
+    est donc une seule recherche avec la valeur de g interdite (exclude),
+    les valeurs de la solution étant essayées en dernier (avoid). Les
+    composantes indépendantes de la grille creusée sont résolues à part
+    (decompose) : une sonde sans autre solution échoue dans la composante
+    de g sans réexplorer les autres.
+
+    - difficulty="hard" : grille minimale (aucun given n'est retirable)
+    - difficulty="easy" : un retrait n'est accepté que si la propagation seule
+      résout encore la grille (pas de backtracking nécessaire)
+    - target_givens : arrêt dès que ce nombre de givens est atteint
+    - probe_nodes : budget par sonde ; une sonde épuisée garde le given
+      (l'unicité reste garantie, la minimalité seulement à ce budget près ;
+      None = minimalité exacte, coûteuse au-delà de ~16x16)
+
+    Retour: dict (r,c)->value
+    """
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"unknown difficulty {difficulty!r}, expected one of {DIFFICULTIES}")
+    rng = random.Random(seed) if seed is not None else random
+    givens = dict(solution)
+    solver = BitsetSolver(regions, rows=rows, cols=cols)
+    order = list(givens)
+    rng.shuffle(order)
+    for cell in order:
+        if target_givens is not None and len(givens) <= target_givens:
+            break
+        v = givens.pop(cell)
+        solver.givens = givens
+        if difficulty == "easy":
+            domains = solver.propagate()
+            keep = domains is None or any(len(d) > 1 for d in domains.values())
+        else:
+            other = solver.solve(timeout_nodes=probe_nodes, propagation=True,
+                                 exclude={cell: v}, avoid=solution, decompose=True)
+            keep = other is not None or solver.timed_out
+        if keep:
+            givens[cell] = v
+    return givens
+
+def estimate_difficulty(regions, givens, rows=None, cols=None,
+                        timeout_nodes: Optional[int]=None) -> Tuple[Optional[str], SolveStats]:
+    """
+    Difficulté d'une grille d'après les statistiques du moteur bitset avec
+    propagation : "easy" si la propagation seule la résout (aucun choix,
+    max_depth == 0), "hard" sinon, None si insoluble ou budget épuisé.
+    Les SolveStats (noeuds, retours arrière, propagations...) permettent un
+    classement plus fin.
+
+    Retour: (difficulté, stats)
+    """
+    solver = BitsetSolver(regions, givens=givens, rows=rows, cols=cols)
+    if solver.solve(timeout_nodes=timeout_nodes, propagation=True) is None:
+        return None, solver.stats
+    return ("easy" if solver.stats.max_depth == 0 else "hard"), solver.stats
+
+def generate_puzzle(rows:int=8, cols:int=8, max_region_size:int=5, max_tries:int=50, seed=None,
+                    min_region_size=2, target_givens: Optional[int]=None, difficulty: str="hard"):
+    """
+    Génère une grille Suguru valide : partition aléatoire remplie par le
+    solveur, réparée localement si besoin (voir fill_regions), puis givens
+    retirés tant que la solution reste unique (voir dig_puzzle, qui reçoit
+    target_givens et difficulty). max_tries borne le nombre d'appels au
+    solveur global pour le remplissage.
+
     Retourne (regions, solution, givens) ou None si impossible.
     """
     if seed is not None:
         random.seed(seed)
 
-    for attempt in range(max_tries):
-        regions = random_partition(rows, cols, max_region_size)
-        puzzle = SuguruPuzzle(rows, cols, regions, givens={})
-        solution = puzzle.solve()
-        if solution:
-            # créer les "givens" : une case par région
-            givens = {}
-            for rid, cells in regions.items():
-                cell = random.choice(cells)
-                givens[cell] = solution[cell]
-            return regions, solution, givens
+    # tailles tirées vers max_region_size : moins de régions à fusionner avant
+    # remplissage (voir _FILL_MEAN), min_region_size reste garanti
+    regions = random_partition(rows, cols, max_region_size, min_region_size=min_region_size,
+                               mean_region_size=max_region_size)
+    filled = fill_regions(regions, rows, cols, max_region_size, min_region_size, max_tries=max_tries)
+    if filled:
+        regions, solution = filled
+        # ids renumérotés dans l'ordre de lecture
+        regions = dict(enumerate(sorted(regions.values(), key=min)))
+        givens = dig_puzzle(regions, solution, rows, cols, target_givens=target_givens,
+                            difficulty=difficulty)
+        return regions, solution, givens
 
     print(f"[Warning] Failed to generate puzzle after {max_tries} tries.")
     return None
@@ -117,6 +654,8 @@ if __name__ == "__main__":
     regions, sol, givens = generate_puzzle(r,c, max_region_size=5, seed=42)
     print("Regions:", {k:len(v) for k,v in regions.items()})
     print("Givens count:", len(givens))
+    level, stats = estimate_difficulty(regions, givens, r, c)
+    print("Difficulty:", level, stats)
     # print solution grid
     grid = [[sol[(i,j)] for j in range(c)] for i in range(r)]
     for row in grid:
@@ -0,0 +1,146 @@
+# suguru_grid.py
+"""
+État d'une grille en cours de résolution, pour l'interface.
+
+GridState garde la carte case -> région, les compteurs de valeurs par
+région et l'ensemble des paires de voisines en conflit ; chaque saisie
+(set / clear) les met à jour en O(taille de région + 8), sans rescanner la
+grille. Le fond SVG (couleurs et bordures des régions) est calculé une
+seule fois ; seul le texte des cases modifiées est régénéré.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from suguru_solver import Cell
+
+PALETTE = ["#e6f7ff", "#fff5e6", "#e6ffe6", "#ffe6f2", "#f2e6ff", "#f0fff0", "#fff0f5"]
+
+_OFFSETS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+
+
+class GridState:
+    def __init__(self, rows: int, cols: int, regions: Dict[int, List[Cell]],
+                 givens: Optional[Dict[Cell,int]] = None, values: Optional[Dict[Cell,int]] = None,
+                 cell_size: int=50):
+        self.rows = rows
+        self.cols = cols
+        self.regions = regions
+        self.givens = dict(givens or {})
+        self.cell_size = cell_size
+        self.cell_region: Dict[Cell, int] = {cell: rid for rid, cells in regions.items() for cell in cells}
+        self.values: Dict[Cell, int] = {}
+        # region_counts[rid][v] : nombre de cases de rid valant v
+        self.region_counts: Dict[int, Dict[int, int]] = {rid: {} for rid in regions}
+        self.bad_regions: Set[int] = set()
+        # paires (a, b), a < b, de cases voisines de même valeur
+        self.conflicts: Set[Tuple[Cell, Cell]] = set()
+        self._texts: Dict[Cell, str] = {}
+        self._background: Optional[str] = None
+        for cell, v in self.givens.items():
+            self.set(cell, v)
+        for cell, v in (values or {}).items():
+            if cell not in self.givens:
+                self.set(cell, v)
+
+    def set(self, cell: Cell, value: int):
+        """Saisit value dans cell (0 ou None : vide la case)."""
+        old = self.values.get(cell)
+        if old == (value or None):
+            return
+        rid = self.cell_region.get(cell)
+        if old:
+            del self.values[cell]
+            self._update_region(rid, old, -1)
+            for nb in self._neighbors(cell):
+                self.conflicts.discard((min(cell, nb), max(cell, nb)))
+        if value:
+            self.values[cell] = value
+            self._update_region(rid, value, +1)
+            for nb in self._neighbors(cell):
+                if self.values.get(nb) == value:
+                    self.conflicts.add((min(cell, nb), max(cell, nb)))
+        self._texts.pop(cell, None)
+
+    def clear(self, cell: Cell):
+        self.set(cell, 0)
+
+    def _neighbors(self, cell: Cell):
+        r, c = cell
+        for dr, dc in _OFFSETS:
+            nb = (r + dr, c + dc)
+            if nb in self.cell_region:
+                yield nb
+
+    def _update_region(self, rid: Optional[int], value: int, delta: int):
+        if rid is None:
+            return
+        counts = self.region_counts[rid]
+        k = counts.get(value, 0) + delta
+        if k:
+            counts[value] = k
+        else:
+            del counts[value]
+        if any(n > 1 for n in counts.values()):
+            self.bad_regions.add(rid)
+        else:
+            self.bad_regions.discard(rid)
+
+    def errors(self) -> List[str]:
+        """Messages de conflit : un par région en doublon, un par paire de voisines."""
+        errors = [f"Doublon dans la région {rid}" for rid in sorted(self.bad_regions)]
+        for (a, b) in sorted(self.conflicts):
+            errors.append(f"Conflit entre ({a[0]+1},{a[1]+1}) et ({b[0]+1},{b[1]+1})")
+        return errors
+
+    def is_complete(self) -> bool:
+        """Toutes les cases remplies, sans conflit."""
+        return len(self.values) == len(self.cell_region) and not self.bad_regions and not self.conflicts
+
+    # ==============================
+    # Rendu SVG
+    # ==============================
+
+    def _static_svg(self) -> str:
+        # fond : couleurs des régions, grille fine, bordures épaisses entre régions
+        if self._background is None:
+            size = self.cell_size
+            colors: Dict[int, str] = {}
+            parts = []
+            for r in range(self.rows):
+                for c in range(self.cols):
+                    rid = self.cell_region.get((r, c))
+                    color = colors.setdefault(rid, PALETTE[len(colors) % len(PALETTE)])
+                    parts.append(f'<rect x="{c*size}" y="{r*size}" width="{size}" height="{size}" fill="{color}" '
+                                 f'stroke="#999" stroke-width="1" data-row="{r}" data-col="{c}" class="cell"/>')
+            for r in range(self.rows):
+                for c in range(self.cols):
+                    rid = self.cell_region.get((r, c))
+                    x, y = c * size, r * size
+                    if c + 1 < self.cols and self.cell_region.get((r, c + 1)) != rid:
+                        parts.append(f'<line x1="{x+size}" y1="{y}" x2="{x+size}" y2="{y+size}" '
+                                     f'stroke="black" stroke-width="3" pointer-events="none"/>')
+                    if r + 1 < self.rows and self.cell_region.get((r + 1, c)) != rid:
+                        parts.append(f'<line x1="{x}" y1="{y+size}" x2="{x+size}" y2="{y+size}" '
+                                     f'stroke="black" stroke-width="3" pointer-events="none"/>')
+            parts.append(f'<rect x="0" y="0" width="{self.cols*size}" height="{self.rows*size}" fill="none" '
+                         f'stroke="black" stroke-width="4" pointer-events="none"/>')
+            self._background = "".join(parts)
+        return self._background
+
+    def _text(self, cell: Cell) -> str:
+        text = self._texts.get(cell)
+        if text is None:
+            r, c = cell
+            size = self.cell_size
+            color = "darkblue" if cell in self.givens else "black"
+            text = (f'<text x="{c*size + size/2}" y="{r*size + size/2 + 6}" text-anchor="middle" '
+                    f'font-size="20" fill="{color}" pointer-events="none">{self.values[cell]}</text>')
+            self._texts[cell] = text
+        return text
+
+    def svg(self) -> str:
+        """SVG complet : fond mis en cache + texte des cases remplies."""
+        size = self.cell_size
+        return "".join([f'<svg id="suguru" width="{self.cols*size}" height="{self.rows*size}" '
+                        f'xmlns="http://www.w3.org/2000/svg">', self._static_svg()]
+                       + [self._text(cell) for cell in self.values] + ["</svg>"])
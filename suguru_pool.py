@@ -0,0 +1,178 @@
+# suguru_pool.py
+"""
+Réserve de grilles pré-générées pour l'app.
+
+Un thread de fond garde `per_kind` grilles prêtes pour chaque couple
+(taille, difficulté) ; get() sert une grille en temps constant (ou attend
+`timeout` secondes qu'une grille arrive) et réveille le thread pour
+compléter la réserve. La génération elle-même tourne dans un processus à
+part : elle ne dispute pas le GIL aux requêtes de l'app, qui restent
+fluides même pendant une génération longue. Les grilles sont gardées sous forme
+compacte (codes de suguru_format) et, si `path` est donné, enregistrées
+dans un fichier JSON pour survivre aux redémarrages.
+
+    pool = PuzzlePool(sizes=range(5, 13), per_kind=3, path="pool.json")
+    pool.start()
+    puzzle = pool.get(size=8)     # (regions, solution, givens, rows, cols) ou None
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import json
+import os
+import random
+import tempfile
+import threading
+
+from suguru_format import to_string, from_string
+from suguru_generator import generate_puzzle
+
+
+def _valid_code(code, size: int) -> bool:
+    """Vrai si code se décode en une grille size x size avec sa solution."""
+    if not isinstance(code, str):
+        return False
+    try:
+        regions, givens, solution, rows, cols = from_string(code)
+    except ValueError:
+        return False
+    return solution is not None and rows == size and cols == size
+
+
+class PuzzlePool:
+    def __init__(self, sizes: Iterable[int]=range(5, 13), difficulties: Iterable[str]=("hard",),
+                 per_kind: int=3, path: Optional[str]=None, max_region_size: int=5):
+        self.kinds: List[Tuple[int, str]] = [(n, d) for n in sizes for d in difficulties]
+        self.per_kind = per_kind
+        self.path = path
+        self.max_region_size = max_region_size
+        self._ready: Dict[Tuple[int, str], deque] = {kind: deque() for kind in self.kinds}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stopping = False
+        self._load()
+
+    def start(self):
+        """Lance le thread de remplissage (sans effet s'il tourne déjà)."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=1)
+            self._thread = threading.Thread(target=self._run, name="suguru-pool", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float]=None):
+        """Arrête le thread après la grille en cours, puis le processus de génération."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._cond:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def get(self, size: Optional[int]=None, difficulty: str="hard",
+            timeout: Optional[float]=None):
+        """
+        Une grille prête, retirée de la réserve : (regions, solution, givens, rows, cols),
+        ou None si la réserve est vide pour ce choix (size=None : taille quelconque).
+        timeout : attend jusqu'à timeout secondes qu'une grille arrive (None : pas d'attente)
+        """
+        with self._cond:
+            def available():
+                return [k for k in self.kinds if k[1] == difficulty and self._ready[k]
+                        and (size is None or k[0] == size)]
+            kinds = available() if not timeout else self._cond.wait_for(available, timeout)
+            if not kinds:
+                return None
+            code = self._ready[random.choice(kinds)].popleft()
+            self._cond.notify_all()
+        regions, givens, solution, rows, cols = from_string(code)
+        return regions, solution, givens, rows, cols
+
+    def counts(self) -> Dict[Tuple[int, str], int]:
+        """Nombre de grilles prêtes par (taille, difficulté)."""
+        with self._cond:
+            return {kind: len(q) for kind, q in self._ready.items()}
+
+    def _missing(self) -> Optional[Tuple[int, str]]:
+        # le type le moins fourni en premier
+        kind = min(self.kinds, key=lambda k: len(self._ready[k]), default=None)
+        if kind is None or len(self._ready[kind]) >= self.per_kind:
+            return None
+        return kind
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping and self._missing() is None:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                size, difficulty = self._missing()
+                executor = self._executor
+            # génération hors verrou et hors processus : ce thread ne fait
+            # qu'attendre le résultat, sans tenir le GIL
+            try:
+                result = executor.submit(generate_puzzle, size, size,
+                                         max_region_size=self.max_region_size,
+                                         difficulty=difficulty).result()
+            except (BrokenProcessPool, RuntimeError):
+                # processus de génération mort (tué, mémoire) ou arrêté par
+                # stop() : on en relance un, sauf si on s'arrête
+                with self._cond:
+                    if self._stopping:
+                        return
+                    self._executor = ProcessPoolExecutor(max_workers=1)
+                continue
+            if result is None:
+                continue
+            regions, solution, givens = result
+            code = to_string(regions, givens, solution, rows=size, cols=size)
+            with self._cond:
+                self._ready[(size, difficulty)].append(code)
+                self._cond.notify_all()
+            self._save()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        puzzles = saved.get("puzzles") if isinstance(saved, dict) else None
+        if not isinstance(puzzles, dict):
+            return
+        for key, codes in puzzles.items():
+            size, _, difficulty = key.partition(":")
+            kind = (int(size), difficulty) if size.isdigit() else None
+            if kind not in self._ready or not isinstance(codes, list):
+                continue
+            # codes périmés ou corrompus écartés ici : get() ne sert que des grilles décodables
+            valid = [code for code in codes if _valid_code(code, kind[0])]
+            self._ready[kind].extend(valid[:self.per_kind])
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._cond:
+            saved = {"puzzles": {f"{n}:{d}": list(q) for (n, d), q in self._ready.items()}}
+        # écriture atomique : fichier temporaire puis renommage
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(saved, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
@@ -3,72 +3,267 @@
 Solveur Suguru (Tectonic / Kemaru)
 
 Fournit :
+- class CompiledLayout / compile_layout(regions, rows, cols) : disposition
+  précompilée (tables plates), partagée entre résolutions via un cache LRU
 - class SuguruPuzzle : utilitaire interne
-- function solve_puzzle(regions, givens, rows=None, cols=None, timeout_nodes=None)
+- class BitsetSolver : moteur à domaines bitmask (engine="bitset")
+- function solve_puzzle(regions, givens, rows=None, cols=None, timeout_nodes=None, engine="backtrack")
     => renvoie dict {(r,c): value} ou None si insolvable / timeout
+- function solve_with_status(...) => SolveResult(status, solution, nodes, elapsed, stats),
+  status "solved" / "unsat" / "timeout" / "cancelled" ; solve_background (Future)
+  et solve_async (coroutine) font la même chose dans un thread
+- class SolveStats (suguru_stats.py) : compteurs de la recherche (solver.stats) ;
+  profile_solve(...) exécute solve_with_status sous cProfile
+- function count_solutions(regions, givens, limit=2, ...) / is_unique(regions, givens, ...)
+    => nombre de solutions plafonné à limit / unicité (None si budget épuisé)
+- function solve_parallel(regions, givens, workers=N, mode="split" | "portfolio")
+    => même retour que solve_puzzle, recherche répartie sur plusieurs processus
+- CLI : python -m suguru_solver batch in.jsonl -o out.jsonl --workers N
 
 Paramètres :
-- regions : dict region_id -> list of (r,c) tuples
+- regions : dict region_id -> list of (r,c) tuples, ou un CompiledLayout
 - givens  : dict (r,c) -> int (peuvent être vides)
 - rows, cols : optionnels ; si omis, déduits depuis les cellules dans regions
 - timeout_nodes : optionnel, coupe la recherche après ce nombre de noeuds explorés
+- time_limit : optionnel, budget en secondes (horloge lue tous les 1024 noeuds)
+- cancel : jeton d'annulation (objet muni de is_set(), ex. threading.Event)
+- progress : rappel progress(noeuds, profondeur, noeuds/s), tous les 1024 noeuds
+- engine : "backtrack" (défaut, SuguruPuzzle), "bitset" (BitsetSolver, bien plus rapide),
+  "dlx" (DLXSolver, couverture exacte, voir suguru_dlx.py) ou "cbj" (CBJSolver,
+  backjumping + nogoods + redémarrages, voir suguru_cbj.py)
+- propagation : si True, propagation jusqu'au point fixe (singletons, pointage, paires, blocs 2x2)
 """
 
-from typing import Dict, Tuple, List, Optional, Set
+from typing import Dict, Tuple, List, NamedTuple, Optional, Set, Iterable, TextIO, Union
+from array import array
+from collections import OrderedDict
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor, Future, wait, as_completed,
+                                FIRST_COMPLETED)
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
 import random
-import time
 import sys
+import threading
+import time
+
+from suguru_stats import Budget, SolveStats
 
 Cell = Tuple[int, int]
 
-class SuguruPuzzle:
-    def __init__(self, regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None, rows: Optional[int]=None, cols: Optional[int]=None):
-        self.regions = regions
-        self.givens = dict(givens or {})
-        # compute grid size if not provided
+
+def grid_dims(regions: Dict[int, List[Cell]], rows: Optional[int]=None,
+              cols: Optional[int]=None) -> Tuple[int, int]:
+    """(rows, cols) : ceux donnés, sinon déduits de la plus grande cellule des régions."""
+    if rows is None or cols is None:
         max_r = -1
         max_c = -1
         for cells in regions.values():
             for (r,c) in cells:
                 if r > max_r: max_r = r
                 if c > max_c: max_c = c
-        if rows is None:
-            self.rows = max_r + 1
-        else:
-            self.rows = rows
-        if cols is None:
-            self.cols = max_c + 1
-        else:
-            self.cols = cols
-
-        # map cell -> region id
-        self.cell_region: Dict[Cell,int] = {}
-        for rid, cells in regions.items():
-            for cell in cells:
-                self.cell_region[cell] = rid
-
-        # region sizes
-        self.region_size: Dict[int,int] = {rid: len(cells) for rid,cells in regions.items()}
-
-        # neighbors (8 directions)
-        self.neighbors: Dict[Cell, List[Cell]] = {}
-        for r in range(self.rows):
-            for c in range(self.cols):
-                nbs = []
-                for dr in (-1,0,1):
-                    for dc in (-1,0,1):
-                        if dr==0 and dc==0:
-                            continue
-                        nr, nc = r+dr, c+dc
-                        if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                            nbs.append((nr,nc))
-                self.neighbors[(r,c)] = nbs
-
-    def solve(self, timeout_nodes: Optional[int]=None, randomize: bool=False) -> Optional[Dict[Cell,int]]:
+        if rows is None: rows = max_r + 1
+        if cols is None: cols = max_c + 1
+    return rows, cols
+
+
+class CompiledLayout:
+    """
+    Disposition compilée d'une grille : tout ce qui ne dépend que des régions
+    (pas des givens), construit une fois et partagé par les solveurs.
+
+    - cellules = indices r*cols + c ; size[i] = taille de la région de i
+      (0 = hors région), region_of[i] = rang de sa région (-1 = hors région)
+    - nbmask[i] : voisins (8 directions) de i, en masque d'indices ;
+      adj[i] : les mêmes, en tuple
+    - peers[i] : voisins ∪ région (hors i), tuple trié
+    - cliques : régions puis blocs 2x2, clique_of[i] / clique_mask[q]
+
+    Les tables par cellule sont des array (un entier machine par case) ;
+    les tables de SuguruPuzzle (dicts de cellules) ne sont construites qu'à
+    la première demande (puzzle_tables).
+    """
+
+    __slots__ = ("key", "regions", "rows", "cols", "size", "region_of", "cells", "nbmask", "adj",
+                 "peers", "cliques", "n_regions", "clique_of", "clique_mask", "_tables")
+
+    def __init__(self, regions: Dict[int, List[Cell]], rows: Optional[int]=None,
+                 cols: Optional[int]=None, key: Optional[tuple]=None):
+        self.rows, self.cols = grid_dims(regions, rows, cols)
+        # copie figée : le cache ne doit pas suivre les mutations de l'appelant
+        self.regions: Dict[int, Tuple[Cell, ...]] = {rid: tuple(cells) for rid, cells in regions.items()}
+        self.key = key if key is not None else layout_key(regions, self.rows, self.cols)
+        self._tables = None
+        n = self.rows * self.cols
+        cols_ = self.cols
+
+        size = array("H", bytes(2 * n))
+        region_of = array("i", [-1]) * n
+        region_idx: List[Tuple[int, ...]] = []
+        for k, cells in enumerate(self.regions.values()):
+            idx = tuple(r*cols_ + c for (r,c) in cells)
+            region_idx.append(idx)
+            for i in idx:
+                size[i] = len(idx)
+                region_of[i] = k
+        self.size = size
+        self.region_of = region_of
+        self.cells = array("i", [i for i in range(n) if size[i]])
+
+        nbmask: List[int] = [0] * n
+        adj: List[Tuple[int, ...]] = [()] * n
+        for i in self.cells:
+            r, c = divmod(i, cols_)
+            m = 0
+            near = []
+            for dr in (-1,0,1):
+                for dc in (-1,0,1):
+                    nr, nc = r+dr, c+dc
+                    if (dr or dc) and 0 <= nr < self.rows and 0 <= nc < cols_:
+                        j = nr*cols_ + nc
+                        if size[j]:
+                            m |= 1 << j
+                            near.append(j)
+            nbmask[i] = m
+            adj[i] = tuple(near)
+        self.nbmask = nbmask
+        self.adj = adj
+
+        # peers : voisins ∪ région, sans doublon
+        peers: List[Set[int]] = [set() for _ in range(n)]
+        for idx in region_idx:
+            for i in idx:
+                peers[i].update(idx)
+        for i in self.cells:
+            m = nbmask[i]
+            while m:
+                b = m & -m
+                peers[i].add(b.bit_length() - 1)
+                m ^= b
+            peers[i].discard(i)
+        self.peers: List[Tuple[int, ...]] = [tuple(sorted(p)) for p in peers]
+
+        # cliques (cellules deux à deux distinctes) : les régions, puis les
+        # blocs 2x2 (règle des 8 voisins) ; clique_of[i] = cliques contenant i
+        self.cliques: List[Tuple[int, ...]] = list(region_idx)
+        self.n_regions = len(self.cliques)
+        for r in range(self.rows - 1):
+            for c in range(cols_ - 1):
+                block = (r*cols_ + c, r*cols_ + c + 1, (r+1)*cols_ + c, (r+1)*cols_ + c + 1)
+                if all(size[i] for i in block):
+                    self.cliques.append(block)
+        clique_of: List[List[int]] = [[] for _ in range(n)]
+        for q, cl in enumerate(self.cliques):
+            for i in cl:
+                clique_of[i].append(q)
+        self.clique_of: List[Tuple[int, ...]] = [tuple(x) for x in clique_of]
+        self.clique_mask: List[int] = [sum(1 << i for i in cl) for cl in self.cliques]
+
+    def puzzle_tables(self) -> Tuple[Dict[Cell,int], Dict[int,int], Dict[Cell, List[Cell]]]:
+        """(cell_region, region_size, neighbors) au format de SuguruPuzzle, construits une fois."""
+        if self._tables is None:
+            cell_region = {cell: rid for rid, cells in self.regions.items() for cell in cells}
+            region_size = {rid: len(cells) for rid, cells in self.regions.items()}
+            neighbors: Dict[Cell, List[Cell]] = {}
+            for r in range(self.rows):
+                for c in range(self.cols):
+                    neighbors[(r,c)] = [(r+dr, c+dc) for dr in (-1,0,1) for dc in (-1,0,1)
+                                        if (dr or dc) and 0 <= r+dr < self.rows and 0 <= c+dc < self.cols]
+            self._tables = (cell_region, region_size, neighbors)
+        return self._tables
+
+
+LAYOUT_CACHE_SIZE = 128
+_LAYOUT_CACHE: "OrderedDict[tuple, CompiledLayout]" = OrderedDict()
+_LAYOUT_LOCK = threading.Lock()
+
+def layout_key(regions: Dict[int, List[Cell]], rows: Optional[int]=None,
+               cols: Optional[int]=None) -> tuple:
+    """Clé de cache d'une disposition : dimensions + régions (ids et cellules, dans l'ordre)."""
+    return (rows, cols, tuple((rid, tuple(cells)) for rid, cells in regions.items()))
+
+def compile_layout(regions: Union[Dict[int, List[Cell]], CompiledLayout], rows: Optional[int]=None,
+                   cols: Optional[int]=None) -> CompiledLayout:
+    """
+    CompiledLayout des régions, pris dans un cache LRU (LAYOUT_CACHE_SIZE
+    dispositions) : résoudre plusieurs fois la même grille avec d'autres
+    givens ne recompile rien. Un CompiledLayout est renvoyé tel quel.
+    """
+    if isinstance(regions, CompiledLayout):
+        return regions
+    key = layout_key(regions, rows, cols)
+    with _LAYOUT_LOCK:
+        layout = _LAYOUT_CACHE.get(key)
+        if layout is not None:
+            _LAYOUT_CACHE.move_to_end(key)
+            return layout
+    layout = CompiledLayout(regions, rows, cols, key=key)
+    with _LAYOUT_LOCK:
+        _LAYOUT_CACHE[key] = layout
+        while len(_LAYOUT_CACHE) > LAYOUT_CACHE_SIZE:
+            _LAYOUT_CACHE.popitem(last=False)
+    return layout
+
+
+class SuguruPuzzle:
+    def __init__(self, regions: Union[Dict[int, List[Cell]], CompiledLayout], givens: Optional[Dict[Cell,int]] = None, rows: Optional[int]=None, cols: Optional[int]=None):
+        # shared, cached tables (see compile_layout)
+        self.layout = compile_layout(regions, rows, cols)
+        self.regions = self.layout.regions
+        self.givens = dict(givens or {})
+        self.rows = self.layout.rows
+        self.cols = self.layout.cols
+        # cell -> region id, region sizes, neighbors (8 directions)
+        self.cell_region, self.region_size, self.neighbors = self.layout.puzzle_tables()
+        self.nodes = 0
+        self.timed_out = False
+        self.cancelled = False
+        self.stats = SolveStats()
+
+    def propagate(self) -> Optional[Dict[Cell, Set[int]]]:
+        """
+        Propagate givens to a fixpoint without branching (naked / hidden singles,
+        pointing eliminations, naked pairs, 2x2 blocks ; see BitsetSolver._search).
+        Returns dict cell->set of remaining values, or None on contradiction.
+        """
+        return BitsetSolver(self.layout, self.givens).propagate()
+
+    def solve(self, timeout_nodes: Optional[int]=None, randomize: bool=False,
+              propagation: bool=False, time_limit: Optional[float]=None,
+              cancel=None, progress=None) -> Optional[Dict[Cell,int]]:
         """
         Solve with backtracking + MRV + forward checking.
-        Returns dict cell->value or None if unsatisfiable or timeout.
+        With propagation=True, search starts from the propagate() fixpoint.
+        Budgets and progress work as in BitsetSolver.solve (self.nodes,
+        self.timed_out, self.cancelled) ; counters are left in self.stats
+        (no phase timings for this engine).
+        Returns dict cell->value or None if unsatisfiable, timeout or cancelled.
         """
+        self.nodes = 0
+        self.timed_out = False
+        self.cancelled = False
+        stats = self.stats = SolveStats()
+        started = time.monotonic()
+        # givens off the regions are ignored, as in BitsetSolver._search ; a value
+        # outside 1..|R| or clashing with a peer given makes the grid unsatisfiable
+        givens = {cell: val for cell, val in self.givens.items() if cell in self.cell_region}
+        for cell, val in givens.items():
+            rid = self.cell_region[cell]
+            peers = list(self.neighbors[cell]) + list(self.regions[rid])
+            if not 1 <= val <= self.region_size[rid] or any(
+                    p != cell and givens.get(p) == val for p in peers):
+                stats.wipeouts = 1
+                stats.elapsed = time.monotonic() - started
+                return None
+        propagated: Dict[Cell, Set[int]] = {}
+        if propagation:
+            propagated = self.propagate()
+            if propagated is None:
+                stats.wipeouts = 1
+                stats.elapsed = time.monotonic() - started
+                return None
         # initialize domains
         domains: Dict[Cell, Set[int]] = {}
         for r in range(self.rows):
@@ -80,15 +275,17 @@ class SuguruPuzzle:
                     continue
                 rid = self.cell_region[cell]
                 maxv = self.region_size[rid]
-                if cell in self.givens:
-                    domains[cell] = {self.givens[cell]}
+                if cell in givens:
+                    domains[cell] = {givens[cell]}
+                elif cell in propagated:
+                    domains[cell] = set(propagated[cell])
                 else:
                     domains[cell] = set(range(1, maxv+1))
 
         # apply initial forward reductions from givens
-        assignment: Dict[Cell,int] = dict(self.givens)
+        assignment: Dict[Cell,int] = dict(givens)
         # remove conflicting values from domains caused by givens
-        for cell, val in list(self.givens.items()):
+        for cell, val in list(givens.items()):
             # neighbors cannot have same val
             for nb in self.neighbors[cell]:
                 if val in domains.get(nb, set()):
@@ -99,12 +296,11 @@ class SuguruPuzzle:
                 if mate != cell and val in domains.get(mate, set()):
                     domains[mate].discard(val)
 
-        nodes = 0
-        start_time = time.time()
+        budget = Budget(timeout_nodes, time_limit, cancel, progress)
 
         # helper functions
         def unassigned_cells():
-            return [cell for r in range(self.rows) for c in range(self.cols)
+            return [(r,c) for r in range(self.rows) for c in range(self.cols)
                     if (r,c) in self.cell_region and (r,c) not in assignment]
 
         def select_unassigned_mrv():
@@ -145,7 +341,11 @@ class SuguruPuzzle:
                     return False
             return True
 
-        def forward_check(cell: Cell, value: int, removed: Dict[Cell, Set[int]]) -> bool:
+        # trail unique des retraits (cellule, valeur), dépilé jusqu'à une marque
+        trail_cells: List[Cell] = []
+        trail_vals: List[int] = []
+
+        def forward_check(cell: Cell, value: int) -> bool:
             # remove value from domains of region mates and neighbors
             rid = self.cell_region[cell]
             # region mates
@@ -153,24 +353,27 @@ class SuguruPuzzle:
                 if mate == cell or mate in assignment: continue
                 if value in domains[mate]:
                     domains[mate].remove(value)
-                    removed.setdefault(mate, set()).add(value)
+                    trail_cells.append(mate)
+                    trail_vals.append(value)
                     if not domains[mate]:
+                        stats.wipeouts += 1
                         return False
             # neighbors
             for nb in self.neighbors[cell]:
                 if nb in assignment: continue
                 if value in domains.get(nb, set()):
                     domains[nb].remove(value)
-                    removed.setdefault(nb, set()).add(value)
+                    trail_cells.append(nb)
+                    trail_vals.append(value)
                     if not domains[nb]:
+                        stats.wipeouts += 1
                         return False
             return True
 
-        def restore(removed: Dict[Cell, Set[int]]):
-            for cell, vals in removed.items():
-                domains[cell].update(vals)
-
-        sys.setrecursionlimit(10000)
+        def undo_to(mark: int):
+            stats.propagations += max(len(trail_cells) - mark, 0)
+            while len(trail_cells) > mark:
+                domains[trail_cells.pop()].add(trail_vals.pop())
 
         # order domain values: try smaller values first, optionally randomize tie order
         def order_domain(cell):
@@ -181,65 +384,1159 @@ class SuguruPuzzle:
                 vals.sort()
             return vals
 
-        def backtrack():
-            nonlocal nodes
-            # timeout by node count
-            nodes += 1
-            if timeout_nodes and nodes > timeout_nodes:
-                return None
-            # optional time cutoff (safe guard)
-            if time.time() - start_time > 30.0:  # 30s hard limit
-                return None
-            if len(assignment) == len([c for c in self.cell_region.keys()]):
-                return dict(assignment)
+        # recherche itérative : pile de choix [cellule, valeurs, prochain indice, marque du trail]
+        total = len(self.cell_region)
+        stack: List[list] = []
+
+        def finish(result):
+            stats.nodes = self.nodes
+            stats.propagations += len(trail_cells)
+            stats.elapsed = time.monotonic() - started
+            return result
+
+        while True:
+            # nouveau noeud
+            self.nodes += 1
+            if self.nodes >= budget.next and not budget.check(self.nodes, len(stack)):
+                self.timed_out, self.cancelled = budget.timed_out, budget.cancelled
+                return finish(None)
+            if len(assignment) == total:
+                return finish(dict(assignment))
 
             cell = select_unassigned_mrv()
-            if cell is None:
-                return None
+            if cell is not None:
+                stack.append([cell, order_domain(cell), 0, len(trail_cells)])
+                stats.max_depth = max(stats.max_depth, len(stack))
 
-            for val in order_domain(cell):
-                if not consistent(cell, val):
+            # valeur suivante du choix le plus profond, en remontant si épuisé
+            while stack:
+                frame = stack[-1]
+                cell, vals, k, mark = frame
+                undo_to(mark)
+                assignment.pop(cell, None)
+                while k < len(vals):
+                    val = vals[k]
+                    k += 1
+                    if not consistent(cell, val):
+                        continue
+                    assignment[cell] = val
+                    if forward_check(cell, val):
+                        break
+                    undo_to(mark)
+                    del assignment[cell]
+                else:
+                    stack.pop()
+                    stats.backtracks += 1
                     continue
-                assignment[cell] = val
-                removed = {}
-                ok = forward_check(cell, val, removed)
-                if ok:
-                    result = backtrack()
-                    if result is not None:
-                        return result
-                restore(removed)
-                del assignment[cell]
+                frame[2] = k
+                break
+            else:
+                return finish(None)
+
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _popcount(x: int) -> int:
+        return bin(x).count("1")
+
+
+class BitsetSolver:
+    """
+    Moteur "bitset" : même recherche (MRV départagé par le nombre de voisines
+    libres + forward checking) que SuguruPuzzle, mais sur des structures plates.
+
+    - cellules = indices r*cols + c
+    - domaine = entier, le bit v-1 est à 1 si la valeur v est encore possible
+    - peers[i] = 8 voisins ∪ cellules de la région (hors i), précalculés
+    - buckets[9*k + 8 - f] = cellules non assignées dont le domaine a k
+      valeurs et qui ont f voisines (8 directions) non assignées, tenus à
+      jour à chaque retrait et assignation : le premier seau non vide donne
+      le choix MRV et son départage sans rescanner la grille
+
+    Avec propagation=True, chaque noeud est propagé jusqu'au point fixe
+    (voir _search) avant de brancher.
+
+    Les structures précalculées viennent du CompiledLayout (partagé, voir
+    compile_layout) : self.givens peut être remplacé entre deux appels pour
+    réutiliser le même solveur.
+    """
+
+    def __init__(self, regions: Union[Dict[int, List[Cell]], CompiledLayout],
+                 givens: Optional[Dict[Cell,int]] = None,
+                 rows: Optional[int]=None, cols: Optional[int]=None):
+        layout = compile_layout(regions, rows, cols)
+        self.layout = layout
+        self.regions = layout.regions
+        self.givens = dict(givens or {})
+        self.rows = layout.rows
+        self.cols = layout.cols
+        n = self.rows * self.cols
+        self.size = layout.size
+        self.cells = layout.cells
+        self.nbmask = layout.nbmask
+        self.adj = layout.adj
+        self.peers = layout.peers
+        self.cliques = layout.cliques
+        self.n_regions = layout.n_regions
+        self.clique_of = layout.clique_of
+        self.clique_mask = layout.clique_mask
+        self.nodes = 0
+        self.timed_out = False
+        self.cancelled = False
+        self.conflicts: List[int] = [0] * n
+        self.stats = SolveStats()
+
+    def solve(self, timeout_nodes: Optional[int]=None, randomize: bool=False,
+              propagation: bool=False, time_limit: Optional[float]=None,
+              cancel=None, exclude: Optional[Dict[Cell,int]]=None,
+              avoid: Optional[Dict[Cell,int]]=None, progress=None,
+              timing: bool=False, trace=None, decompose: bool=False) -> Optional[Dict[Cell,int]]:
+        """
+        Résout la grille ; même contrat que SuguruPuzzle.solve.
+        Le nombre de noeuds explorés reste disponible dans self.nodes,
+        les statistiques dans self.stats (timing, trace : voir _search).
+        time_limit : budget en secondes (self.timed_out)
+        cancel : objet muni de is_set() (threading/multiprocessing.Event),
+        la recherche s'arrête (self.cancelled) dès qu'il est levé.
+        progress : appelée avec (noeuds, profondeur, noeuds/s)
+        exclude : cell -> valeur interdite dans cette cellule
+        avoid : cell -> valeur essayée en dernier (ex. une solution connue,
+        pour trouver vite une solution différente)
+        decompose : résout séparément les composantes indépendantes (voir components)
+        """
+        if decompose:
+            return self._by_components(1, timeout_nodes, randomize, propagation, time_limit,
+                                       cancel, exclude, avoid, progress, timing, trace)[0]
+        for value in self._search(timeout_nodes, randomize, propagation, time_limit=time_limit,
+                                  cancel=cancel, exclude=exclude, avoid=avoid, progress=progress,
+                                  timing=timing, trace=trace):
+            return {divmod(i, self.cols): value[i] for i in self.cells}
+        return None
+
+    def count(self, limit: Optional[int]=2, timeout_nodes: Optional[int]=None,
+              time_limit: Optional[float]=None, propagation: bool=True,
+              cancel=None, progress=None, timing: bool=False, trace=None,
+              decompose: bool=False) -> Optional[int]:
+        """
+        Compte les solutions, en s'arrêtant dès que limit est atteint
+        (limit=None : toutes). Retourne None si un budget est épuisé avant
+        (ou si cancel est levé).
+        decompose : compte chaque composante indépendante à part et fait le
+        produit (voir components)
+        """
+        if decompose:
+            return self._by_components(limit, timeout_nodes, False, propagation, time_limit,
+                                       cancel, None, None, progress, timing, trace)[1]
+        found = 0
+        for _ in self._search(timeout_nodes, propagation=propagation, time_limit=time_limit,
+                              cancel=cancel, progress=progress, timing=timing, trace=trace):
+            found += 1
+            if limit and found >= limit:
+                return found
+        if self.timed_out or self.cancelled:
             return None
+        return found
+
+    def propagate(self) -> Optional[Dict[Cell, Set[int]]]:
+        """
+        Propage les givens jusqu'au point fixe, sans brancher.
+        Retourne dict cell -> set des valeurs encore possibles, ou None si
+        une contradiction est détectée.
+        """
+        for value in self._search(propagation=True, root_only=True):
+            domains = self._domains
+            return {divmod(i, self.cols): ({value[i]} if value[i] else
+                                           {v for v in range(1, self.size[i]+1) if domains[i] >> (v-1) & 1})
+                    for i in self.cells}
+        return None
+
+    def components(self, propagation: bool=True) -> Optional[List[List[Cell]]]:
+        """
+        Composantes indépendantes des cellules restées libres après les givens
+        (et la propagation) : deux cellules libres sont liées si elles sont
+        voisines ou de la même région. Les cellules assignées séparent les
+        composantes, qui se résolvent donc chacune sans regarder les autres.
+        Retour: listes de cellules, ou None si une contradiction est détectée
+        """
+        for value in self._search(propagation=propagation, root_only=True):
+            return [[divmod(i, self.cols) for i in comp] for comp in self._components(value)]
+        return None
+
+    def _components(self, value: List[int]) -> List[List[int]]:
+        # parcours en largeur du graphe des pairs, restreint aux cellules libres
+        peers = self.peers
+        seen = [False] * len(value)
+        comps = []
+        for i in self.cells:
+            if value[i] or seen[i]:
+                continue
+            seen[i] = True
+            comp = [i]
+            for j in comp:
+                for p in peers[j]:
+                    if not value[p] and not seen[p]:
+                        seen[p] = True
+                        comp.append(p)
+            comps.append(comp)
+        return comps
+
+    def _by_components(self, limit: Optional[int], timeout_nodes: Optional[int], randomize: bool,
+                       propagation: bool, time_limit: Optional[float], cancel,
+                       exclude: Optional[Dict[Cell,int]], avoid: Optional[Dict[Cell,int]],
+                       progress, timing: bool, trace) -> Tuple[Optional[Dict[Cell,int]], Optional[int]]:
+        """
+        Recherche composante par composante (decompose=True) : racine
+        propagée une fois, puis une recherche par composante (les plus petites
+        d'abord) avec les cellules fixées comme givens. Un échec dans une
+        composante conclut sans revenir sur les autres, et les nombres de
+        solutions se multiplient (chacune n'est comptée que jusqu'à ce que le
+        produit atteigne limit). Budgets et statistiques portent sur le total.
+        Retour: (première solution ou None, nombre de solutions plafonné à
+        limit, None si un budget est épuisé avant)
+        """
+        start = time.monotonic()
+        deadline = start + time_limit if time_limit else None
+        stats = SolveStats()
+        root = None
+        for root in self._search(propagation=propagation, root_only=True, exclude=exclude):
+            break
+        stats.add(self.stats)
+        nodes = 0
+        solution: Optional[Dict[Cell,int]] = None
+        total = 0
+        if root is not None:
+            fixed = {divmod(i, self.cols): root[i] for i in self.cells if root[i]}
+            solution = dict(fixed)
+            total = 1
+            for comp in sorted(self._components(root), key=len):
+                budget = timeout_nodes - nodes if timeout_nodes else None
+                remaining = deadline - time.monotonic() if deadline else None
+                if (budget is not None and budget <= 0) or (remaining is not None and remaining <= 0):
+                    self.timed_out = True
+                    break
+                need = -(-limit // total) if limit else None
+                found = 0
+                for value in self._search(budget, randomize, propagation, time_limit=remaining,
+                                          cancel=cancel, exclude=exclude, avoid=avoid,
+                                          progress=progress, timing=timing, trace=trace,
+                                          scope=comp, givens=fixed):
+                    if not found:
+                        solution.update((divmod(i, self.cols), value[i]) for i in comp)
+                    found += 1
+                    if need and found >= need:
+                        break
+                nodes += self.nodes
+                stats.add(self.stats)
+                if self.timed_out or self.cancelled:
+                    break
+                total *= found
+                if not total:
+                    break
+        self.nodes = nodes
+        self.stats = stats
+        stats.elapsed = time.monotonic() - start
+        if self.timed_out or self.cancelled:
+            return None, None
+        if not total:
+            return None, 0
+        return solution, (min(total, limit) if limit else total)
+
+    def _search(self, timeout_nodes: Optional[int]=None, randomize: bool=False,
+                propagation: bool=False, root_only: bool=False, time_limit: Optional[float]=None,
+                cancel=None, exclude: Optional[Dict[Cell,int]]=None,
+                avoid: Optional[Dict[Cell,int]]=None, progress=None,
+                timing: bool=False, trace=None, scope: Optional[List[int]]=None,
+                givens: Optional[Dict[Cell,int]]=None):
+        """
+        Générateur : produit la liste value (indice -> valeur) à chaque
+        solution trouvée ; la reprise continue la recherche.
+        self.timed_out indique si elle s'est arrêtée sur un budget
+        (timeout_nodes, ou time_limit en secondes), self.cancelled sur
+        cancel.is_set() ; horloge et annulation sont lues tous les 1024 noeuds,
+        et progress(noeuds, profondeur, noeuds/s) y est appelée.
+
+        Règles de propagation (propagation=True), appliquées jusqu'au point fixe :
+        - singleton nu : domaine à une valeur -> assignation
+        - singleton caché : dans une clique qui doit contenir la valeur v
+          (région, ou bloc 2x2 dont l'union des domaines a exactement 4 valeurs),
+          une seule cellule candidate pour v -> assignation
+        - pointage : toute cellule voisine de tous les candidats de v dans
+          une telle clique ne peut pas valoir v
+        - paire nue : deux cellules d'une clique avec le même domaine {a,b}
+          retirent a et b des autres cellules de la clique
+
+        self.stats (SolveStats) est à jour à chaque solution produite et en
+        fin de recherche ; timing=True chronomètre les phases, trace est
+        appelée avec (profondeur, (r,c), valeur) à chaque valeur essayée.
+
+        scope : indices des seules cellules libres à placer (une composante
+        indépendante, voir components) ; givens remplace alors self.givens
+        par les cellules déjà fixées.
+        """
+        self.nodes = 0
+        self.timed_out = False
+        self.cancelled = False
+        start = time.monotonic()
+        clock = time.perf_counter
+        stats = self.stats = SolveStats()
+        # compteurs en variables locales, recopiés dans stats par finish()
+        restored = 0   # entrées du trail déjà dépilées
+        backtracks = 0
+        max_depth = 0
+        wipeouts = 0   # échecs de propagation, un par domaine vidé ou clique impossible
+        top = 0
+        budget = Budget(timeout_nodes, time_limit, cancel, progress, start)
+        size = self.size
+        peers = self.peers
+        cells = self.cells
+        cols_ = self.cols
+        n = len(size)
+        maxsize = max(size) if n else 0
+        nbmask = self.nbmask
+        adj = self.adj
+        cliques = self.cliques
+        clique_of = self.clique_of
+        clique_mask = self.clique_mask
+        n_regions = self.n_regions
+
+        domains = [(1 << s) - 1 for s in size]
+        self._domains = domains
+        # conflicts[i] : nombre d'échecs (domaine vidé, clique impossible)
+        # impliquant la cellule i, pour localiser ce qui bloque une grille
+        conflicts = [0] * n
+        self.conflicts = conflicts
+        value = [0] * n
+
+        def finish():
+            stats.nodes = self.nodes
+            stats.backtracks = backtracks
+            stats.max_depth = max_depth
+            stats.propagations = restored + top
+            stats.wipeouts = wipeouts
+            stats.elapsed = time.monotonic() - start
+
+        for (r,c), v in (self.givens if givens is None else givens).items():
+            i = r*cols_ + c
+            if not (0 <= r < self.rows and 0 <= c < cols_) or not size[i]:
+                continue
+            bit = 1 << (v-1) if 1 <= v <= size[i] else 0
+            if not domains[i] & bit:
+                conflicts[i] += 1
+                wipeouts += 1
+                finish()
+                return
+            domains[i] = bit
+            value[i] = v
+            for p in peers[i]:
+                domains[p] &= ~bit
+                if value[p] == v:
+                    conflicts[i] += 1
+                    wipeouts += 1
+                    finish()
+                    return
+        for (r,c), v in (exclude or {}).items():
+            i = r*cols_ + c
+            if 0 <= r < self.rows and 0 <= c < cols_ and size[i] and not value[i] and 1 <= v <= size[i]:
+                domains[i] &= ~(1 << (v-1))
+        # avoid_bit[i] : valeur à essayer en dernier dans i (0 = aucune)
+        avoid_bit = [0] * n
+        for (r,c), v in (avoid or {}).items():
+            i = r*cols_ + c
+            if 0 <= r < self.rows and 0 <= c < cols_ and 1 <= v <= size[i]:
+                avoid_bit[i] = 1 << (v-1)
 
-        result = backtrack()
-        return result
+        count = [0] * n
+        # free_nb[i] : voisines libres de i ; slot[i] : seau de i (-1 si assignée,
+        # choisie ou hors recherche), 9*count + 8 - free_nb
+        free_nb = [0] * n
+        slot = [-1] * n
+        buckets: List[Set[int]] = [set() for _ in range(9 * (maxsize + 1))]
+        remaining = 0
+        free = cells if scope is None else scope
+        for i in free:
+            if value[i]:
+                continue
+            k = _popcount(domains[i])
+            if k == 0:
+                conflicts[i] += 1
+                wipeouts += 1
+                finish()
+                return
+            count[i] = k
+            slot[i] = 0
+            remaining += 1
+        for i in free:
+            if slot[i] >= 0:
+                f = sum(1 for j in adj[i] if slot[j] >= 0)
+                free_nb[i] = f
+                slot[i] = 9 * count[i] + 8 - f
+                buckets[slot[i]].add(i)
 
-def solve_puzzle(regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+        # trail préalloué : chaque entrée retire au moins un bit d'un domaine
+        # (masque > 0) ou marque une assignation par propagation (masque 0)
+        cap = sum(size) + len(cells) + 1
+        trail_cell = [0] * cap
+        trail_mask = [0] * cap
+        # file de propagation : cellules modifiées, cliques à réexaminer
+        queue: List[int] = []
+        queued = [False] * n
+        dirty: List[int] = []
+        is_dirty = [False] * len(cliques)
+
+        def remove(p: int, mask: int) -> bool:
+            # retire mask du domaine de p (non assignée) ; False si vidé
+            nonlocal top, wipeouts
+            d = domains[p]
+            mask &= d
+            if not mask:
+                return True
+            d ^= mask
+            domains[p] = d
+            nk = _popcount(d)
+            b = slot[p]
+            buckets[b].discard(p)
+            b += 9 * (nk - count[p])
+            buckets[b].add(p)
+            slot[p] = b
+            count[p] = nk
+            trail_cell[top] = p
+            trail_mask[top] = mask
+            top += 1
+            if not nk:
+                conflicts[p] += 1
+                wipeouts += 1
+                return False
+            if not queued[p]:
+                queued[p] = True
+                queue.append(p)
+            return True
+
+        def detach(p: int):
+            # p quitte les cellules libres (assignée ou choisie)
+            buckets[slot[p]].discard(p)
+            slot[p] = -1
+            for j in adj[p]:
+                free_nb[j] -= 1
+                b = slot[j]
+                if b >= 0:
+                    buckets[b].discard(j)
+                    buckets[b + 1].add(j)
+                    slot[j] = b + 1
+
+        def attach(p: int):
+            # p redevient libre
+            for j in adj[p]:
+                free_nb[j] += 1
+                b = slot[j]
+                if b >= 0:
+                    buckets[b].discard(j)
+                    buckets[b - 1].add(j)
+                    slot[j] = b - 1
+            b = 9 * count[p] + 8 - free_nb[p]
+            buckets[b].add(p)
+            slot[p] = b
+
+        def clique_rules(q: int) -> bool:
+            # False si la clique ne peut plus être complétée ; un domaine
+            # vidé par remove() est déjà compté dans wipeouts
+            nonlocal wipeouts
+            cl = cliques[q]
+            placed = 0
+            union = 0
+            free = []
+            for c in cl:
+                if value[c]:
+                    placed |= 1 << (value[c] - 1)
+                else:
+                    union |= domains[c]
+                    free.append(c)
+            if not free:
+                return True
+            total = placed | union
+            if _popcount(total) < len(cl):
+                wipeouts += 1
+                return False
+            if q < n_regions or _popcount(total) == len(cl):
+                need = total & ~placed
+                while need:
+                    bit = need & -need
+                    need ^= bit
+                    cands = [c for c in free if domains[c] & bit]
+                    if not cands:
+                        wipeouts += 1
+                        return False
+                    if len(cands) == 1:
+                        c = cands[0]
+                        if domains[c] != bit and not remove(c, domains[c] ^ bit):
+                            return False
+                        continue
+                    m = nbmask[cands[0]]
+                    for c in cands[1:]:
+                        m &= nbmask[c]
+                    m &= ~clique_mask[q]
+                    while m:
+                        b = m & -m
+                        m ^= b
+                        j = b.bit_length() - 1
+                        if not value[j] and domains[j] & bit and not remove(j, bit):
+                            return False
+            for a in range(len(free)):
+                ca = free[a]
+                da = domains[ca]
+                if count[ca] != 2:
+                    continue
+                for cb in free[a+1:]:
+                    if domains[cb] == da:
+                        for c in free:
+                            if c != ca and c != cb and domains[c] & da and not remove(c, da):
+                                return False
+                        break
+            return True
+
+        def propagate() -> bool:
+            nonlocal top, remaining
+            ok = True
+            while ok and (queue or dirty):
+                if queue:
+                    p = queue.pop()
+                    queued[p] = False
+                    if not value[p] and count[p] == 1:
+                        # singleton nu : assignation, tracée par un masque 0
+                        bit = domains[p]
+                        value[p] = bit.bit_length()
+                        detach(p)
+                        remaining -= 1
+                        trail_cell[top] = p
+                        trail_mask[top] = 0
+                        top += 1
+                        for j in peers[p]:
+                            if not value[j] and domains[j] & bit and not remove(j, bit):
+                                ok = False
+                                break
+                    for q in clique_of[p]:
+                        if not is_dirty[q]:
+                            is_dirty[q] = True
+                            dirty.append(q)
+                else:
+                    q = dirty.pop()
+                    is_dirty[q] = False
+                    ok = clique_rules(q)
+                    if not ok:
+                        for c in cliques[q]:
+                            conflicts[c] += 1
+            if not ok:
+                reset_queue()
+            return ok
+
+        def reset_queue():
+            for p in queue:
+                queued[p] = False
+            for q in dirty:
+                is_dirty[q] = False
+            queue.clear()
+            dirty.clear()
+
+        if propagation:
+            for i in free:
+                if not value[i]:
+                    queued[i] = True
+                    queue.append(i)
+            for q in (range(len(cliques)) if scope is None else
+                      sorted({q for i in scope for q in clique_of[i]})):
+                is_dirty[q] = True
+                dirty.append(q)
+            t0 = clock() if timing else 0.0
+            ok = propagate()
+            if timing:
+                stats.time_propagate += clock() - t0
+            if not ok:
+                finish()
+                return
+        if root_only:
+            finish()
+            yield value
+            return
+
+        # pile de choix : cellule, valeurs restant à essayer, marque du trail
+        depth = 0
+        stack_cell = [0] * (remaining + 1)
+        stack_todo = [0] * (remaining + 1)
+        stack_mark = [0] * (remaining + 1)
+
+        while True:
+            # nouveau noeud
+            self.nodes += 1
+            if self.nodes >= budget.next and not budget.check(self.nodes, depth):
+                self.timed_out, self.cancelled = budget.timed_out, budget.cancelled
+                finish()
+                return
+            if remaining == 0:
+                finish()
+                yield value
+            else:
+                if timing:
+                    t0 = clock()
+                # premier seau non vide : plus petit domaine, puis le plus
+                # de voisines libres, puis ordre de lecture (comme SuguruPuzzle)
+                for b in range(9, len(buckets)):
+                    if buckets[b]:
+                        i = min(buckets[b])
+                        detach(i)
+                        remaining -= 1
+                        stack_cell[depth] = i
+                        stack_todo[depth] = domains[i]
+                        stack_mark[depth] = top
+                        depth += 1
+                        if depth > max_depth:
+                            max_depth = depth
+                        break
+                if timing:
+                    stats.time_select += clock() - t0
+
+            # valeur suivante du choix le plus profond, en remontant si épuisé
+            while depth:
+                d = depth - 1
+                i = stack_cell[d]
+                mark = stack_mark[d]
+                if timing:
+                    t0 = clock()
+                restored += top - mark
+                while top > mark:
+                    top -= 1
+                    p = trail_cell[top]
+                    mask = trail_mask[top]
+                    if mask:
+                        domains[p] |= mask
+                        nk = _popcount(domains[p])
+                        b = slot[p]
+                        buckets[b].discard(p)
+                        b += 9 * (nk - count[p])
+                        buckets[b].add(p)
+                        slot[p] = b
+                        count[p] = nk
+                    else:
+                        value[p] = 0
+                        attach(p)
+                        remaining += 1
+                if timing:
+                    stats.time_restore += clock() - t0
+                todo = stack_todo[d]
+                if not todo:
+                    value[i] = 0
+                    attach(i)
+                    remaining += 1
+                    depth = d
+                    backtracks += 1
+                    continue
+                t = todo & ~avoid_bit[i] or todo
+                if randomize:
+                    bits = []
+                    while t:
+                        bit = t & -t
+                        bits.append(bit)
+                        t ^= bit
+                    bit = random.choice(bits)
+                else:
+                    bit = t & -t
+                stack_todo[d] = todo ^ bit
+                value[i] = bit.bit_length()
+                if trace is not None:
+                    trace(depth, divmod(i, cols_), value[i])
+                if timing:
+                    t0 = clock()
+                ok = True
+                if propagation:
+                    for p in peers[i]:
+                        if not value[p] and domains[p] & bit and not remove(p, bit):
+                            ok = False
+                            break
+                    if ok:
+                        for q in clique_of[i]:
+                            if not is_dirty[q]:
+                                is_dirty[q] = True
+                                dirty.append(q)
+                        ok = propagate()
+                    else:
+                        reset_queue()
+                else:
+                    # forward checking : retire bit des pairs non assignés
+                    for p in peers[i]:
+                        dp = domains[p]
+                        if dp & bit and not value[p]:
+                            domains[p] = dp ^ bit
+                            k = count[p]
+                            b = slot[p]
+                            buckets[b].discard(p)
+                            buckets[b - 9].add(p)
+                            slot[p] = b - 9
+                            count[p] = k - 1
+                            trail_cell[top] = p
+                            trail_mask[top] = bit
+                            top += 1
+                            if k == 1:
+                                conflicts[p] += 1
+                                wipeouts += 1
+                                ok = False
+                                break
+                if timing:
+                    stats.time_propagate += clock() - t0
+                if ok:
+                    break
+            else:
+                finish()
+                return
+
+
+ENGINES = ("backtrack", "bitset", "dlx", "cbj")
+
+
+class SolveResult(NamedTuple):
+    """Issue d'une résolution : status parmi STATUSES, solution si "solved"."""
+    status: str
+    solution: Optional[Dict[Cell,int]]
+    nodes: int
+    elapsed: float
+    stats: Optional[SolveStats] = None
+
+STATUSES = ("solved", "unsat", "timeout", "cancelled")
+
+
+def _make_solver(regions: Union[Dict[int, List[Cell]], CompiledLayout], givens: Optional[Dict[Cell,int]],
+                 rows: Optional[int], cols: Optional[int], engine: str):
+    if engine == "dlx":
+        from suguru_dlx import DLXSolver   # suguru_dlx importe ce module
+        if isinstance(regions, CompiledLayout):
+            regions, rows, cols = regions.regions, regions.rows, regions.cols
+        return DLXSolver(regions, givens=givens, rows=rows, cols=cols)
+    if engine == "bitset":
+        return BitsetSolver(regions, givens=givens, rows=rows, cols=cols)
+    if engine == "backtrack":
+        return SuguruPuzzle(regions, givens=givens, rows=rows, cols=cols)
+    if engine == "cbj":
+        from suguru_cbj import CBJSolver   # suguru_cbj importe ce module
+        return CBJSolver(regions, givens=givens, rows=rows, cols=cols)
+    raise ValueError(f"engine inconnu : {engine!r} (attendu : {', '.join(ENGINES)})")
+
+def solve_with_status(regions: Union[Dict[int, List[Cell]], CompiledLayout],
+                      givens: Optional[Dict[Cell,int]] = None, rows: Optional[int]=None,
+                      cols: Optional[int]=None, engine: str="bitset", propagation: bool=True,
+                      timeout_nodes: Optional[int]=None, time_limit: Optional[float]=None,
+                      cancel=None, progress=None, randomize: bool=False,
+                      timing: bool=False, trace=None, decompose: bool=False) -> SolveResult:
+    """
+    Comme solve_puzzle, mais distingue les issues :
+    "solved", "unsat", "timeout" (timeout_nodes / time_limit) ou "cancelled".
+
+    - time_limit: budget en secondes, lu tous les 1024 noeuds
+    - cancel: jeton d'annulation, objet muni de is_set() (threading.Event...)
+    - progress: appelée tous les 1024 noeuds avec (noeuds, profondeur, noeuds/s)
+    - timing: chronométrage par phase dans stats (moteur bitset)
+    - trace: appelée avec (profondeur, (r,c), valeur) à chaque valeur essayée
+      (moteur bitset)
+    - decompose: composantes indépendantes résolues séparément (moteur bitset,
+      voir BitsetSolver.components)
+    """
+    start = time.perf_counter()
+    solver = _make_solver(regions, givens, rows, cols, engine)
+    options = {} if engine == "dlx" else {"propagation": propagation}
+    if engine == "bitset":
+        options.update(timing=timing, trace=trace, decompose=decompose)
+    sol = solver.solve(timeout_nodes=timeout_nodes, randomize=randomize, time_limit=time_limit,
+                       cancel=cancel, progress=progress, **options)
+    if sol is not None:
+        status = "solved"
+    elif solver.cancelled:
+        status = "cancelled"
+    elif solver.timed_out:
+        status = "timeout"
+    else:
+        status = "unsat"
+    return SolveResult(status, sol, solver.nodes, time.perf_counter() - start, solver.stats)
+
+def profile_solve(regions: Union[Dict[int, List[Cell]], CompiledLayout],
+                  givens: Optional[Dict[Cell,int]] = None, sort: str="cumulative",
+                  limit: int=25, out: Optional[TextIO]=None, **options) -> SolveResult:
+    """
+    solve_with_status(regions, givens, **options) sous cProfile ; le
+    rapport (pstats, trié par sort, limit lignes) est écrit dans out
+    (défaut : stderr).
+    """
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    result = profiler.runcall(solve_with_status, regions, givens, **options)
+    pstats.Stats(profiler, stream=out or sys.stderr).sort_stats(sort).print_stats(limit)
+    return result
+
+def solve_puzzle(regions: Union[Dict[int, List[Cell]], CompiledLayout], givens: Optional[Dict[Cell,int]] = None,
                  rows: Optional[int]=None, cols: Optional[int]=None, timeout_nodes: Optional[int]=None,
-                 randomize: bool=False) -> Optional[Dict[Cell,int]]:
+                 randomize: bool=False, engine: str="backtrack",
+                 propagation: bool=False, time_limit: Optional[float]=None,
+                 cancel=None, progress=None) -> Optional[Dict[Cell,int]]:
     """
     Wrapper utilitaire attendu par l'app.
 
-    - regions: dict region_id -> list of (r,c)
+    - regions: dict region_id -> list of (r,c), ou CompiledLayout (compile_layout)
     - givens: dict (r,c)->int (optionnel)
-    - rows, cols: dimensions optionnelles
+    - rows, cols: dimensions optionnelles (ignorées pour un CompiledLayout)
     - timeout_nodes: stop après N noeuds explorés (optionnel)
     - randomize: si True, ordre des valeurs aléatoire (utile pour générateur)
+    - engine: "backtrack" (SuguruPuzzle), "bitset" (BitsetSolver), "dlx" (DLXSolver)
+      ou "cbj" (CBJSolver, pour les grandes grilles peu contraintes)
+    - propagation: si True, propagation jusqu'au point fixe (à la racine pour
+      "backtrack" et "cbj", à chaque noeud pour "bitset")
+    - time_limit, cancel, progress: voir solve_with_status
+
+    Retour: dict (r,c)->value ou None si impossible / timeout / annulé
+    (solve_with_status distingue ces cas)
+    """
+    return solve_with_status(regions, givens, rows, cols, engine=engine, propagation=propagation,
+                             timeout_nodes=timeout_nodes, time_limit=time_limit, cancel=cancel,
+                             progress=progress, randomize=randomize).solution
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def solve_background(regions: Union[Dict[int, List[Cell]], CompiledLayout],
+                     givens: Optional[Dict[Cell,int]] = None, executor: Optional[ThreadPoolExecutor]=None,
+                     **options) -> "Future[SolveResult]":
+    """
+    Lance solve_with_status(regions, givens, **options) dans un thread et
+    rend aussitôt un Future. Pour l'interrompre, passer cancel=threading.Event()
+    et le lever (Future.cancel() n'arrête pas une recherche déjà lancée).
+    """
+    global _EXECUTOR
+    if executor is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                               thread_name_prefix="suguru-solve")
+            executor = _EXECUTOR
+    return executor.submit(solve_with_status, regions, givens, **options)
+
+async def solve_async(regions: Union[Dict[int, List[Cell]], CompiledLayout],
+                      givens: Optional[Dict[Cell,int]] = None, executor: Optional[ThreadPoolExecutor]=None,
+                      **options) -> SolveResult:
+    """
+    Version coroutine : la recherche tourne dans un thread, hors de la boucle
+    asyncio. Si la tâche qui attend est annulée, la recherche l'est aussi
+    (via le jeton cancel, créé s'il n'est pas fourni ou vaut None). progress
+    est appelée depuis le thread de recherche.
+    """
+    if options.get("cancel") is None:
+        options["cancel"] = threading.Event()
+    cancel = options["cancel"]
+    future = solve_background(regions, givens, executor=executor, **options)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        cancel.set()
+        raise
+
+def count_solutions(regions: Union[Dict[int, List[Cell]], CompiledLayout], givens: Optional[Dict[Cell,int]] = None,
+                    limit: Optional[int]=2, rows: Optional[int]=None, cols: Optional[int]=None,
+                    timeout_nodes: Optional[int]=None, time_limit: Optional[float]=None,
+                    engine: str="bitset", decompose: bool=False) -> Optional[int]:
+    """
+    Nombre de solutions, plafonné à limit.
+
+    - limit: arrêt dès que ce nombre est atteint (None : comptage complet)
+    - timeout_nodes / time_limit: budgets en noeuds / en secondes
+    - engine: "bitset" (avec propagation), "dlx" ou "cbj"
+    - decompose: produit des comptes des composantes indépendantes (bitset)
+
+    Retour: nombre de solutions (<= limit) ou None si un budget est épuisé avant
+    """
+    if engine not in ("bitset", "dlx", "cbj"):
+        raise ValueError(f"engine de comptage inconnu : {engine!r} (attendu : bitset, dlx, cbj)")
+    solver = _make_solver(regions, givens, rows, cols, engine)
+    options = {"decompose": decompose} if engine == "bitset" else {}
+    return solver.count(limit=limit, timeout_nodes=timeout_nodes, time_limit=time_limit, **options)
+
+def is_unique(regions: Union[Dict[int, List[Cell]], CompiledLayout], givens: Optional[Dict[Cell,int]] = None,
+              rows: Optional[int]=None, cols: Optional[int]=None,
+              timeout_nodes: Optional[int]=None, time_limit: Optional[float]=None,
+              engine: str="bitset", decompose: bool=False) -> Optional[bool]:
+    """
+    True si la grille a exactement une solution, False sinon,
+    None si un budget est épuisé avant de conclure.
+    """
+    n = count_solutions(regions, givens, limit=2, rows=rows, cols=cols,
+                        timeout_nodes=timeout_nodes, time_limit=time_limit, engine=engine,
+                        decompose=decompose)
+    return None if n is None else n == 1
+
+# ==============================
+# Résolution parallèle d'une grille difficile
+# ==============================
+
+_CANCEL = None   # Event partagé, installé dans chaque worker par _init_parallel_worker
+
+def _init_parallel_worker(cancel):
+    global _CANCEL
+    _CANCEL = cancel
+
+def _parallel_solve(regions: Dict[int, List[Cell]], givens: Dict[Cell,int], rows: Optional[int],
+                    cols: Optional[int], seed: Optional[int], propagation: bool,
+                    timeout_nodes: Optional[int], time_limit: Optional[float]):
+    """Worker : (solution ou None, noeuds, arrêt prématuré)."""
+    if seed is not None:
+        random.seed(seed)
+    solver = BitsetSolver(regions, givens=givens, rows=rows, cols=cols)
+    sol = solver.solve(timeout_nodes=timeout_nodes, randomize=seed is not None,
+                       propagation=propagation, time_limit=time_limit, cancel=_CANCEL)
+    return sol, solver.nodes, solver.timed_out or solver.cancelled
+
+def split_puzzle(regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+                 rows: Optional[int]=None, cols: Optional[int]=None,
+                 parts: int=8) -> List[Dict[Cell,int]]:
+    """
+    Découpe l'arbre de recherche en sous-problèmes disjoints (givens étendus)
+    en développant les premières décisions MRV après propagation, jusqu'à
+    obtenir au moins `parts` sous-arbres. Les branches contradictoires sont
+    écartées ; liste vide si la grille est insoluble.
+    """
+    frontier: List[Tuple[Dict[Cell,int], Dict[Cell, Set[int]]]] = []
+    root = dict(givens or {})
+    domains = BitsetSolver(regions, root, rows, cols).propagate()
+    if domains is None:
+        return []
+    frontier.append((root, domains))
+    while len(frontier) < parts:
+        # développe le sous-problème dont le MRV a le plus petit domaine > 1
+        best = None
+        for k, (g, doms) in enumerate(frontier):
+            open_cells = [(len(d), cell) for cell, d in doms.items() if len(d) > 1]
+            if open_cells:
+                size, cell = min(open_cells)
+                if best is None or size < best[0]:
+                    best = (size, k, cell)
+        if best is None:
+            break
+        _, k, cell = best
+        g, doms = frontier.pop(k)
+        for v in sorted(doms[cell]):
+            child = dict(g)
+            child[cell] = v
+            child_domains = BitsetSolver(regions, child, rows, cols).propagate()
+            if child_domains is not None:
+                frontier.append((child, child_domains))
+        if not frontier:
+            break
+    return [g for g, _ in frontier]
+
+def solve_parallel(regions: Dict[int, List[Cell]], givens: Optional[Dict[Cell,int]] = None,
+                   rows: Optional[int]=None, cols: Optional[int]=None, workers: Optional[int]=None,
+                   mode: str="split", timeout_nodes: Optional[int]=None,
+                   time_limit: Optional[float]=None, propagation: bool=True) -> Optional[Dict[Cell,int]]:
+    """
+    Résout une grille sur plusieurs processus (moteur bitset).
+
+    - mode="split": l'arbre est découpé aux premières décisions MRV
+      (split_puzzle, ~4 sous-arbres par worker) et les sous-arbres sont
+      distribués ; insoluble si tous les sous-arbres le sont
+    - mode="portfolio": `workers` recherches randomize=True de graines
+      différentes sur la grille entière, la première qui conclut gagne
+
+    Dès qu'une solution est trouvée, les tâches en attente sont annulées et
+    celles en cours s'arrêtent via un Event partagé (lu tous les 1024 noeuds).
+    timeout_nodes / time_limit s'appliquent à chaque tâche.
 
     Retour: dict (r,c)->value ou None si impossible / timeout
     """
-    puzzle = SuguruPuzzle(regions, givens=givens, rows=rows, cols=cols)
-    return puzzle.solve(timeout_nodes=timeout_nodes, randomize=randomize)
+    workers = workers or os.cpu_count() or 1
+    if mode == "split":
+        tasks = [(g, None) for g in split_puzzle(regions, givens, rows, cols, parts=4 * workers)]
+    elif mode == "portfolio":
+        tasks = [(dict(givens or {}), seed) for seed in range(workers)]
+    else:
+        raise ValueError(f"mode inconnu : {mode!r} (attendu : split, portfolio)")
+    if not tasks:
+        return None
+
+    cancel = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parallel_worker,
+                             initargs=(cancel,)) as pool:
+        futures = [pool.submit(_parallel_solve, regions, g, rows, cols, seed, propagation,
+                               timeout_nodes, time_limit) for g, seed in tasks]
+        try:
+            for fut in as_completed(futures):
+                sol, _, stopped = fut.result()
+                if sol is not None:
+                    return sol
+                if mode == "portfolio" and not stopped:
+                    return None   # une recherche complète a prouvé l'insolubilité
+            return None
+        finally:
+            cancel.set()
+            for fut in futures:
+                fut.cancel()
+
+# ==============================
+# CLI : résolution par lots (JSONL)
+# ==============================
+#
+#   python -m suguru_solver batch in.jsonl -o out.jsonl --workers N
+#
+# Une grille par ligne :
+#   {"id": ..., "regions": {"0": [[r,c], ...], ...}, "givens": [[r,c,v], ...],
+#    "rows": R, "cols": C}            (id, givens, rows, cols optionnels)
+# Une ligne de résultat par grille :
+#   {"id": ..., "status": "solved" | "unsat" | "timeout" | "error",
+#    "nodes": N, "time": secondes, "solution": [[v, ...], ...]}
+# avec --stats, un champ "stats" en plus (SolveStats.as_dict, phases chronométrées)
+
+def puzzle_from_json(obj: dict) -> Tuple[Dict[int, List[Cell]], Dict[Cell,int], Optional[int], Optional[int]]:
+    """
+    Décode une grille au format JSONL du batch -> (regions, givens, rows, cols).
+    ValueError si la ligne n'a pas la forme attendue.
+    """
+    if not isinstance(obj, dict) or not isinstance(obj.get("regions"), dict):
+        raise ValueError("objet JSON attendu, avec un champ regions (objet id -> cellules)")
+    regions = {int(rid): [(int(r), int(c)) for r, c in cells] for rid, cells in obj["regions"].items()}
+    givens = {(int(r), int(c)): int(v) for r, c, v in obj.get("givens", [])}
+    rows, cols = obj.get("rows"), obj.get("cols")
+    for dim in (rows, cols):
+        if dim is not None and (not isinstance(dim, int) or isinstance(dim, bool) or dim < 0):
+            raise ValueError(f"dimension invalide : {dim!r}")
+    size = {}
+    for cells in regions.values():
+        for r, c in cells:
+            if r < 0 or c < 0 or (rows is not None and r >= rows) or (cols is not None and c >= cols):
+                raise ValueError(f"cellule hors grille : {(r, c)}")
+            size[(r, c)] = len(cells)
+    for cell, v in givens.items():
+        if cell not in size:
+            raise ValueError(f"given hors des régions : {cell}")
+        if not 1 <= v <= size[cell]:
+            raise ValueError(f"given {v} hors de 1..{size[cell]} en {cell}")
+    return regions, givens, rows, cols
+
+def _batch_solve(line: str, engine: str, propagation: bool, timeout_nodes: Optional[int],
+                 time_limit: Optional[float], with_stats: bool=False) -> Tuple[str, str]:
+    """Worker du batch : une ligne JSON en entrée, (statut, ligne JSON) en sortie."""
+    start = time.perf_counter()
+    result: dict = {"id": None}
+    try:
+        obj = json.loads(line)
+        if isinstance(obj, dict):
+            result["id"] = obj.get("id")
+        regions, givens, rows, cols = puzzle_from_json(obj)
+        layout = compile_layout(regions, rows, cols)
+        res = solve_with_status(layout, givens, engine=engine, propagation=propagation,
+                                timeout_nodes=timeout_nodes, time_limit=time_limit, timing=with_stats)
+        result["status"] = res.status
+        result["nodes"] = res.nodes
+        if with_stats and res.stats is not None:
+            result["stats"] = res.stats.as_dict()
+        if res.solution is not None:
+            sol = res.solution
+            result["solution"] = [[sol.get((r,c), 0) for c in range(layout.cols)] for r in range(layout.rows)]
+    except (ValueError, KeyError, TypeError) as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["time"] = round(time.perf_counter() - start, 6)
+    return result["status"], json.dumps(result)
+
+def run_batch(lines: Iterable[str], out: TextIO, workers: int=1, engine: str="bitset",
+              propagation: bool=True, timeout_nodes: Optional[int]=None,
+              time_limit: Optional[float]=None, ordered: bool=True,
+              max_in_flight: Optional[int]=None, with_stats: bool=False) -> Dict[str, int]:
+    """
+    Résout un flux de lignes JSONL et écrit les résultats dans out.
+
+    - workers: nombre de processus (<= 1 : dans le processus courant)
+    - ordered: résultats dans l'ordre d'entrée, sinon au fil de l'eau
+    - max_in_flight: borne sur les grilles soumises non encore écrites
+      (défaut 4 * workers), la mémoire reste constante quelle que soit l'entrée
+    - with_stats: ajoute les statistiques de recherche à chaque ligne
+
+    Retour: compteurs par statut
+    """
+    counts: Dict[str, int] = {}
+
+    def emit(res: Tuple[str, str]):
+        status, line = res
+        out.write(line + "\n")
+        counts[status] = counts.get(status, 0) + 1
+
+    lines = (line for line in lines if line.strip())
+    if workers <= 1:
+        for line in lines:
+            emit(_batch_solve(line, engine, propagation, timeout_nodes, time_limit, with_stats))
+        return counts
+
+    bound = max_in_flight or 4 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Dict[Future, int] = {}
+        done_buffer: Dict[int, Tuple[str, str]] = {}   # mode ordonné : résultats en avance
+        next_out = 0
+        seq = 0
+        exhausted = False
+        while True:
+            # remplit la fenêtre ; en mode ordonné elle couvre aussi le tampon
+            while not exhausted and seq - next_out < bound and len(pending) < bound:
+                line = next(lines, None)
+                if line is None:
+                    exhausted = True
+                    break
+                fut = pool.submit(_batch_solve, line, engine, propagation, timeout_nodes, time_limit,
+                                  with_stats)
+                pending[fut] = seq
+                seq += 1
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                k = pending.pop(fut)
+                if ordered:
+                    done_buffer[k] = fut.result()
+                else:
+                    emit(fut.result())
+                    next_out += 1
+            while next_out in done_buffer:
+                emit(done_buffer.pop(next_out))
+                next_out += 1
+    return counts
+
+def main(argv: Optional[List[str]]=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m suguru_solver", description="Solveur Suguru")
+    sub = parser.add_subparsers(dest="command")
+    batch = sub.add_parser("batch", help="résout un fichier JSONL de grilles")
+    batch.add_argument("input", help="fichier JSONL d'entrée ('-' pour stdin)")
+    batch.add_argument("-o", "--output", default="-", help="fichier JSONL de sortie (défaut : stdout)")
+    batch.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    batch.add_argument("--engine", choices=("bitset", "dlx", "cbj"), default="bitset")
+    batch.add_argument("--no-propagation", action="store_true", help="forward checking seul (bitset)")
+    batch.add_argument("--timeout-nodes", type=int, default=None)
+    batch.add_argument("--time-limit", type=float, default=None, help="secondes par grille")
+    batch.add_argument("--unordered", action="store_true", help="écrit les résultats au fil de l'eau")
+    batch.add_argument("--max-in-flight", type=int, default=None)
+    batch.add_argument("--stats", action="store_true", help="statistiques de recherche par grille")
+    args = parser.parse_args(argv)
+
+    if args.command != "batch":
+        parser.print_help()
+        return 2
+    fin = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        counts = run_batch(fin, fout, workers=args.workers, engine=args.engine,
+                           propagation=not args.no_propagation, timeout_nodes=args.timeout_nodes,
+                           time_limit=args.time_limit, ordered=not args.unordered,
+                           max_in_flight=args.max_in_flight, with_stats=args.stats)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    print(" ".join(f"{k}={v}" for k, v in sorted(counts.items())), file=sys.stderr)
+    return 0
 
-# quick CLI test when run directly
 if __name__ == "__main__":
-    # petit test 3x3 trivial
-    regions = {
-        0: [(0,0),(0,1)],
-        1: [(0,2),(1,2)],
-        2: [(1,0),(1,1),(2,0)],
-        3: [(2,1),(2,2)]
-    }
-    givens = {}
-    sol = solve_puzzle(regions, givens)
-    print("Solution:", sol)
+    # sous -m, ce fichier tourne en __main__ : passer par le module importé,
+    # celui que chargent les moteurs importés à la demande (suguru_cbj),
+    # pour que CompiledLayout et les workers du batch soient les mêmes classes
+    from suguru_solver import main as _main
+    sys.exit(_main())
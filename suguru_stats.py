@@ -0,0 +1,115 @@
+# suguru_stats.py
+"""
+Statistiques d'une recherche, remplies par les moteurs (solver.stats).
+
+Les compteurs coûtent un incrément par noeud ou par retour arrière ; le
+chronométrage par phase (timing=True) et la trace par noeud (trace=...)
+ne sont actifs que sur demande (moteur bitset) : désactivés, ils ne
+coûtent qu'un test de variable locale.
+
+Budget regroupe les limites d'une recherche (noeuds, délai, annulation,
+progression), partagées par tous les moteurs.
+"""
+
+from typing import Dict, Optional
+import time
+
+
+class SolveStats:
+    """
+    - nodes : noeuds explorés
+    - backtracks : choix épuisés (retours arrière)
+    - max_depth : profondeur maximale de la pile de choix
+    - propagations : retraits de valeurs et assignations forcées
+    - wipeouts : échecs de propagation (domaine vidé, clique impossible)
+    - time_select / time_propagate / time_restore : secondes passées dans le
+      choix MRV, le forward checking / la propagation et la restauration
+      du trail (timing=True seulement, 0 sinon)
+    - elapsed : durée totale en secondes
+    """
+
+    __slots__ = ("nodes", "backtracks", "max_depth", "propagations", "wipeouts",
+                 "time_select", "time_propagate", "time_restore", "elapsed")
+
+    def __init__(self):
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.propagations = 0
+        self.wipeouts = 0
+        self.time_select = 0.0
+        self.time_propagate = 0.0
+        self.time_restore = 0.0
+        self.elapsed = 0.0
+
+    def add(self, other: "SolveStats"):
+        """Cumule other (recherches successives) : sommes, maximum pour max_depth."""
+        for name in self.__slots__:
+            if name == "max_depth":
+                self.max_depth = max(self.max_depth, other.max_depth)
+            else:
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return "SolveStats(" + ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items()) + ")"
+
+
+class Budget:
+    """
+    Limites d'une recherche, vérifiées par les moteurs à chaque noeud :
+
+        budget = Budget(timeout_nodes, time_limit, cancel, progress)
+        ...
+        nodes += 1
+        if nodes >= budget.next and not budget.check(nodes, depth):
+            # budget.timed_out ou budget.cancelled est positionné
+            return
+
+    Le test en ligne ne coûte qu'une comparaison : check() n'est appelée
+    qu'au dépassement de timeout_nodes ou tous les 1024 noeuds (horloge,
+    annulation et progress), et seulement si l'une de ces limites est donnée.
+    """
+
+    __slots__ = ("timeout_nodes", "deadline", "cancel", "progress", "start", "polled",
+                 "next", "timed_out", "cancelled")
+
+    def __init__(self, timeout_nodes: Optional[int]=None, time_limit: Optional[float]=None,
+                 cancel=None, progress=None, start: Optional[float]=None):
+        self.start = time.monotonic() if start is None else start
+        self.timeout_nodes = timeout_nodes
+        self.deadline = self.start + time_limit if time_limit else None
+        self.cancel = cancel
+        self.progress = progress
+        self.polled = bool(self.deadline or cancel is not None or progress is not None)
+        self.timed_out = False
+        self.cancelled = False
+        self.next = 0
+        self._schedule(0)
+
+    def _schedule(self, nodes: int):
+        # prochain noeud à vérifier : dépassement du budget ou multiple de 1024
+        nxt = (nodes | 1023) + 1 if self.polled else float("inf")
+        if self.timeout_nodes:
+            nxt = min(nxt, self.timeout_nodes + 1)
+        self.next = nxt
+
+    def check(self, nodes: int, depth: int) -> bool:
+        """False si la recherche doit s'arrêter (timed_out ou cancelled positionné)."""
+        if self.timeout_nodes and nodes > self.timeout_nodes:
+            self.timed_out = True
+            return False
+        if self.polled and not nodes & 1023:
+            now = time.monotonic()
+            if self.deadline and now > self.deadline:
+                self.timed_out = True
+                return False
+            if self.cancel is not None and self.cancel.is_set():
+                self.cancelled = True
+                return False
+            if self.progress is not None:
+                self.progress(nodes, depth, nodes / max(now - self.start, 1e-9))
+        self._schedule(nodes)
+        return True
@@ -0,0 +1,182 @@
+# suguru_validate.py
+"""
+Validation vectorisée (NumPy) de grilles Suguru complètes, par lots.
+
+    ok, mask = validate_grids(grids, region_map)
+
+- grids : entiers (B, R, C) — ou (R, C) pour une seule grille
+- region_map : étiquettes de régions 0..L-1, -1 hors région ; (R, C)
+  partagée par tout le lot, ou (B, R, C) une carte par grille
+- givens (optionnel) : (R, C) ou (B, R, C), 0 = case libre
+
+Une case est en faute si sa valeur sort de 1..taille de sa région (0 = vide
+compris ; hors région, seule la valeur 0 est admise), si elle répète une
+valeur de sa région, si une voisine (8 directions) a la même valeur, ou si
+elle contredit un given. Retour: (ok, mask), ok[b] vrai si la grille b est
+valide, mask[b] les cases en faute.
+
+Tout est fait par opérations sur tableaux : tailles de régions et doublons
+par bincount sur des clés (grille, région, valeur), adjacence par
+comparaison de tableaux décalés (4 décalages couvrent les 8 directions).
+Le lot est traité par tranches de `chunk` grilles pour borner la mémoire.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import sys
+
+import numpy as np
+
+from suguru_solver import Cell, grid_dims
+
+# décalages (dr, dc) : chaque paire de voisines est vue une fois
+_SHIFTS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def region_array(regions: Dict[int, List[Cell]], rows: Optional[int]=None,
+                 cols: Optional[int]=None) -> np.ndarray:
+    """Carte des régions (rows, cols) : rang de la région dans regions, -1 hors région."""
+    rows, cols = grid_dims(regions, rows, cols)
+    out = np.full((rows, cols), -1, dtype=np.int32)
+    for k, cells in enumerate(regions.values()):
+        if cells:
+            r, c = zip(*cells)
+            out[list(r), list(c)] = k
+    return out
+
+def grid_array(values: Dict[Cell,int], rows: int, cols: int) -> np.ndarray:
+    """Grille (rows, cols) depuis un dict (r,c)->valeur, 0 pour les cases absentes."""
+    out = np.zeros((rows, cols), dtype=np.int32)
+    if values:
+        cells, vals = zip(*values.items())
+        r, c = zip(*cells)
+        out[list(r), list(c)] = vals
+    return out
+
+def _slices(dr: int, dc: int, rows: int, cols: int):
+    # (case, voisine décalée de (dr, dc)) sur les axes (lot, ligne, colonne)
+    a = (slice(None), slice(0, rows - dr), slice(max(0, -dc), cols - max(0, dc)))
+    b = (slice(None), slice(dr, rows), slice(max(0, dc), cols + min(0, dc)))
+    return a, b
+
+def _conflicts(grids: np.ndarray, regions: np.ndarray, givens: Optional[np.ndarray]) -> np.ndarray:
+    batch, rows, cols = grids.shape
+    # valeurs bornées à [-1, 127] : les valeurs absurdes restent en faute,
+    # le reste du calcul se fait sur des octets
+    g = np.clip(grids, -1, 127).astype(np.int8)
+    inside = regions >= 0
+    n_labels = int(regions.max()) + 1 if regions.size else 0
+    # étiquette globale (grille b, région k) -> b * n_labels + k ; avec une
+    # carte partagée, tailles et masques restent en (R, C) et sont diffusés
+    label = np.maximum(regions, 0).astype(np.int64)
+    offsets = (np.arange(batch, dtype=np.int64) * n_labels)[:, None, None]
+    if regions.ndim == 2:
+        sizes = np.bincount(label[inside], minlength=n_labels)
+        size = np.where(inside, sizes[label], 0)
+    else:
+        label = label + offsets
+        sizes = np.bincount(label[inside], minlength=batch * n_labels)
+        size = np.where(inside, sizes[label], 0)
+    size = size.astype(np.int8)
+    bad = (g > size) | (g < inside)
+
+    # doublons dans une région : compte de chaque clé (grille, région, valeur) ;
+    # valeurs en faute et cases hors région tombent sur la valeur 0, ignorée
+    top = int(size.max()) + 1 if size.size else 1
+    vals = np.where(bad, 0, g)
+    key = ((label if regions.ndim == 3 else label + offsets) * top) + vals
+    counts = np.bincount(key.ravel(), minlength=batch * n_labels * top)
+    bad |= (vals > 0) & (counts[key] > 1)
+
+    # voisines de même valeur, sur les 4 décalages
+    nonzero = g != 0
+    for dr, dc in _SHIFTS:
+        a, b = _slices(dr, dc, rows, cols)
+        pair = inside[a[3 - regions.ndim:]] & inside[b[3 - regions.ndim:]]
+        same = (g[a] == g[b]) & nonzero[a] & pair
+        bad[a] |= same
+        bad[b] |= same
+
+    if givens is not None:
+        bad |= (givens != 0) & (g != givens)
+    return bad
+
+def validate_grids(grids, region_map, givens=None, chunk: int=4096) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Valide un lot de grilles complètes (voir l'en-tête du module).
+    Retour: (ok, mask) — ok de forme (B,), mask (B, R, C) ; pour une grille
+    (R, C) seule, ok est un booléen et mask (R, C).
+    """
+    grids = np.asarray(grids)
+    region_map = np.asarray(region_map)
+    single = grids.ndim == 2
+    if single:
+        grids = grids[None]
+    if grids.ndim != 3 or region_map.shape[-2:] != grids.shape[1:] or region_map.ndim not in (2, 3):
+        raise ValueError(f"dimensions incompatibles : grilles {grids.shape}, régions {region_map.shape}")
+    if givens is not None:
+        givens = np.asarray(givens)
+        if givens.shape[-2:] != grids.shape[1:]:
+            raise ValueError(f"dimensions incompatibles : grilles {grids.shape}, givens {givens.shape}")
+    batch = grids.shape[0]
+    mask = np.empty(grids.shape, dtype=bool)
+    for start in range(0, batch, chunk):
+        end = min(start + chunk, batch)
+        reg = region_map[start:end] if region_map.ndim == 3 else region_map
+        giv = givens[start:end] if givens is not None and givens.ndim == 3 else givens
+        mask[start:end] = _conflicts(grids[start:end], reg, giv)
+    ok = ~mask.any(axis=(1, 2))
+    if single:
+        return bool(ok[0]), mask[0]
+    return ok, mask
+
+def validate_solution(regions: Dict[int, List[Cell]], solution: Dict[Cell,int],
+                      givens: Optional[Dict[Cell,int]] = None, rows: Optional[int]=None,
+                      cols: Optional[int]=None) -> bool:
+    """Une solution au format dict est-elle une grille complète valide (et conforme aux givens) ?"""
+    region_map = region_array(regions, rows, cols)
+    rows, cols = region_map.shape
+    giv = grid_array(givens, rows, cols) if givens else None
+    return validate_grids(grid_array(solution, rows, cols), region_map, giv)[0]
+
+def validate_library(path: str, chunk: int=4096) -> List[int]:
+    """
+    Vérifie les solutions d'une bibliothèque (suguru_format.PuzzleLibrary),
+    par lots de grilles de mêmes dimensions.
+    Retour: ids des grilles en faute (solution invalide, absente ou
+    contraire aux givens)
+    """
+    from suguru_format import PuzzleLibrary
+    failed: List[int] = []
+    with PuzzleLibrary(path) as lib:
+        by_shape: Dict[Tuple[int, int], List[int]] = {}
+        for pid in range(len(lib)):
+            _, _, rows, cols, _ = lib.entry(pid)
+            by_shape.setdefault((rows, cols), []).append(pid)
+        for (rows, cols), ids in by_shape.items():
+            for start in range(0, len(ids), chunk):
+                part = ids[start:start + chunk]
+                grids = np.zeros((len(part), rows, cols), dtype=np.int32)
+                maps = np.empty((len(part), rows, cols), dtype=np.int32)
+                givens = np.zeros((len(part), rows, cols), dtype=np.int32)
+                missing = np.zeros(len(part), dtype=bool)
+                for k, pid in enumerate(part):
+                    regions, giv, sol, _, _ = lib[pid]
+                    maps[k] = region_array(regions, rows, cols)
+                    givens[k] = grid_array(giv, rows, cols)
+                    if sol is None:
+                        missing[k] = True
+                    else:
+                        grids[k] = grid_array(sol, rows, cols)
+                ok, _ = validate_grids(grids, maps, givens, chunk=chunk)
+                failed.extend(pid for pid, good in zip(part, ok & ~missing) if not good)
+    failed.sort()
+    return failed
+
+if __name__ == "__main__":
+    # python -m suguru_validate bibliotheque.suglib
+    if len(sys.argv) != 2:
+        print("usage : python -m suguru_validate <bibliothèque>", file=sys.stderr)
+        sys.exit(2)
+    bad = validate_library(sys.argv[1])
+    print(f"{len(bad)} grille(s) en faute" + (" : " + " ".join(map(str, bad)) if bad else ""))
+    sys.exit(1 if bad else 0)